@@ -0,0 +1,94 @@
+"""Generated HTML documents used by the benchmarks"""
+import random
+
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua привет мир &amp; '
+    '&lt;tag&gt; naïve café'
+).split()
+
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def paragraph(rng):
+    return (
+        '<p>{} <b>{}</b> {}\n<a href="https://telegra.ph/?a=1&amp;b=2">{}</a>'
+        ' <i>{}</i>. {}</p>\n'
+    ).format(
+        sentence(rng), sentence(rng, 3), sentence(rng),
+        sentence(rng, 2), sentence(rng, 4), sentence(rng, 20)
+    )
+
+
+def small_post(rng):
+    return '<h3>{}</h3>\n{}{}'.format(
+        sentence(rng, 5), paragraph(rng), paragraph(rng)
+    )
+
+
+def long_article(rng, size=60 * 1024):
+    out = ['<h3>{}</h3>\n'.format(sentence(rng, 5))]
+    length = 0
+
+    while length < size:
+        block = rng.choice((
+            paragraph(rng),
+            paragraph(rng),
+            '<blockquote>{}</blockquote>\n'.format(sentence(rng, 30)),
+            '<figure><img src="/file/6c2ecfdfd6881d37913fa.png"/>'
+            '<figcaption>{}</figcaption></figure>\n'.format(sentence(rng, 6)),
+            '<ul>{}</ul>\n'.format(''.join(
+                '<li>{}</li>'.format(sentence(rng, 8)) for _ in range(5)
+            )),
+        ))
+        out.append(block)
+        length += len(block)
+
+    return ''.join(out)
+
+
+def nested_lists(rng, depth=40, width=3):
+    def make(level):
+        if level == depth:
+            return '<li>{}</li>'.format(sentence(rng, 4))
+
+        return '<li>{}<ul>{}</ul></li>'.format(
+            sentence(rng, 3),
+            make(level + 1) + ''.join(
+                '<li>{}</li>'.format(sentence(rng, 4)) for _ in range(width)
+            )
+        )
+
+    return '<ul>{}</ul>'.format(make(0))
+
+
+def pre_heavy(rng, blocks=60):
+    code = (
+        'def {name}(x):\n'
+        '    if x &lt; 10:\n'
+        '        return x  # {comment}\n'
+        '\n'
+        '    return {name}(x - 1) + 1\n'
+    )
+
+    return ''.join(
+        '<p>{}</p>\n<pre>{}</pre>\n'.format(
+            sentence(rng),
+            code.format(name='fn{}'.format(i), comment=sentence(rng, 4))
+        )
+        for i in range(blocks)
+    )
+
+
+def get_corpora(seed=1337):
+    rng = random.Random(seed)
+
+    return {
+        'small_post': small_post(rng),
+        'long_article': long_article(rng),
+        'nested_lists': nested_lists(rng),
+        'pre_heavy': pre_heavy(rng),
+    }
@@ -0,0 +1,74 @@
+"""
+Import time of the package modules, measured in fresh interpreters.
+
+    python -m benchmarks.import_time        # fails if over budget
+    python -m benchmarks.import_time -n 10
+
+Reported time is the cumulative `-X importtime` of the module (best of
+`-n` runs), imports done by the interpreter startup aren't counted.
+"""
+import argparse
+import subprocess
+import sys
+
+
+# milliseconds, about 3x the time measured when the budget was set so
+# that slower machines pass. `telegraph` and `telegraph.utils` must not
+# import requests, httpx or asyncio
+BUDGETS = {
+    'telegraph': 5,
+    'telegraph.utils': 50,
+}
+
+
+def import_time(module, runs=5):
+    """Best cumulative import time of `module` in seconds"""
+    best = None
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+            stderr=subprocess.PIPE, check=True, universal_newlines=True
+        ).stderr
+
+        # import time: self [us] | cumulative | imported package
+        for line in output.splitlines():
+            _, cumulative, name = line.split('|')
+
+            if name.strip() == module:
+                seconds = int(cumulative) / 1e6
+                break
+        else:
+            raise RuntimeError(
+                '{} not found in -X importtime output'.format(module)
+            )
+
+        if best is None or seconds < best:
+            best = seconds
+
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n', dest='runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    over_budget = []
+
+    for module, budget in BUDGETS.items():
+        ms = import_time(module, args.runs) * 1000
+        print('{:<24} {:>8.1f}ms  budget {:>4}ms'.format(module, ms, budget))
+
+        if ms > budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print('\nOver budget: ' + ', '.join(over_budget))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Benchmarks for the HTML converter and the API client request path.
+
+    python -m benchmarks.run                # compare with baseline.json
+    python -m benchmarks.run --save         # store results as the baseline
+    python -m benchmarks.run -k html_to_nodes
+
+Request path benchmarks run against telegraph.testing.FakeTelegraphServer,
+so they measure the client side only (conversion, encoding, bookkeeping).
+Import time is checked separately by `python -m benchmarks.import_time`.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from telegraph import Telegraph
+from telegraph.cache import PageCache
+from telegraph.nodes import from_dicts
+from telegraph.testing import FakeTelegraphServer
+from telegraph.utils import (
+    html_to_nodes, nodes_to_html, write_nodes_html, json_dumps, FilesOpener
+)
+
+from .corpora import get_corpora
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+class NullWriter:
+    def write(self, data):
+        pass
+
+
+def get_benchmarks():
+    """{name: zero-argument function}"""
+    corpora = get_corpora()
+    benchmarks = {}
+
+    server = FakeTelegraphServer(max_content_size=None)
+    telegraph = Telegraph(session=server.session())
+    telegraph.create_account('benchmark')
+
+    cached_telegraph = Telegraph(
+        session=server.session(), page_cache=PageCache(ttl=None)
+    )
+
+    for corpus_name, html in corpora.items():
+        nodes = html_to_nodes(html)
+        page = telegraph.create_page(corpus_name, content=nodes)
+
+        def get_page(path=page['path']):
+            telegraph.get_page(path)
+            server.requests.clear()
+
+        def create_page(html=html):
+            created = telegraph.create_page('benchmark', html_content=html)
+            server.requests.clear()
+            del server.pages[created['path']]
+
+        benchmarks.update({
+            'html_to_nodes[{}]'.format(corpus_name):
+                lambda html=html: html_to_nodes(html),
+            'nodes_to_html[{}]'.format(corpus_name):
+                lambda nodes=nodes: nodes_to_html(nodes),
+            'write_nodes_html[{}]'.format(corpus_name):
+                lambda nodes=nodes: write_nodes_html(nodes, NullWriter()),
+            'from_dicts[{}]'.format(corpus_name):
+                lambda nodes=nodes: from_dicts(nodes),
+            'json_dumps[{}]'.format(corpus_name):
+                lambda nodes=nodes: json_dumps(nodes),
+            'create_page[{}]'.format(corpus_name): create_page,
+            'get_page[{}]'.format(corpus_name): get_page,
+            'get_page_cached[{}]'.format(corpus_name):
+                lambda path=page['path']: cached_telegraph.get_page(path),
+        })
+
+    files = [(io.BytesIO(b'GIF89a'), 'image.gif') for _ in range(4)]
+
+    def open_files():
+        with FilesOpener(files):
+            pass
+
+    benchmarks['open_files[4 files]'] = open_files
+
+    paths = [
+        telegraph.create_page(str(i), html_content='x')['path']
+        for i in range(10)
+    ]
+
+    def get_views_series():
+        telegraph.get_views_series(
+            paths, date(2024, 1, 1), datetime(2024, 1, 1, 23)
+        )
+        server.requests.clear()
+
+    benchmarks['get_views_series[10 pages x 24 hours]'] = get_views_series
+
+    return benchmarks
+
+
+def measure_speed(fn, min_time=0.2, repeat=5):
+    """Best ops/sec of `repeat` runs, each taking at least `min_time`"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+
+        if elapsed >= min_time:
+            break
+
+        number *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - started)
+
+    return number / best
+
+
+def measure_memory(fn):
+    """(memory blocks held by the result, peak bytes) of a single call"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = sum(
+            stat.count for stat in tracemalloc.take_snapshot().statistics('filename')
+        )
+        tracemalloc.reset_peak()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = sum(
+            stat.count for stat in tracemalloc.take_snapshot().statistics('filename')
+        )
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return after - before, peak
+
+
+def run(pattern=None):
+    results = {}
+
+    for name, fn in get_benchmarks().items():
+        if pattern and pattern not in name:
+            continue
+
+        blocks, peak = measure_memory(fn)
+        results[name] = {
+            'ops': measure_speed(fn),
+            'blocks': blocks,
+            'peak_memory': peak,
+        }
+        print('.', end='', file=sys.stderr, flush=True)
+
+    print(file=sys.stderr)
+    return results
+
+
+def report(results, baseline, threshold):
+    """Print comparison table, returns names of regressed benchmarks"""
+    regressions = []
+
+    print('{:<32} {:>12} {:>9} {:>12} {:>12}'.format(
+        'benchmark', 'ops/sec', 'change', 'peak memory', 'blocks'
+    ))
+
+    for name, result in results.items():
+        change = ''
+        base = baseline.get(name)
+
+        if base:
+            ratio = result['ops'] / base['ops']
+            change = '{:+.1%}'.format(ratio - 1)
+
+            if ratio < 1 - threshold:
+                regressions.append(name)
+                change += ' !'
+
+        print('{:<32} {:>12.1f} {:>9} {:>12} {:>12}'.format(
+            name, result['ops'], change, result['peak_memory'],
+            result['blocks']
+        ))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='pattern', help='run matching benchmarks')
+    parser.add_argument(
+        '--save', action='store_true', help='store results as the baseline'
+    )
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='slowdown reported as a regression (default 0.2 = 20%%)'
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.pattern)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+    elif regressions:
+        print('\nRegressed: ' + ', '.join(regressions))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
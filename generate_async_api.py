@@ -1,28 +1,160 @@
-"""Generate async api from sync api"""
+"""Generate async api from sync api
+
+    python generate_async_api.py          # write telegraph/aio.py
+    python generate_async_api.py --check  # fail if telegraph/aio.py is stale
+"""
+import argparse
+import os
+import sys
 from typing import Optional
 
 import libcst as cst
-from libcst._nodes.expression import Await
-from libcst._nodes.whitespace import SimpleWhitespace
+import libcst.matchers as m
 
 
-class SyncToAsyncTransformer(cst.CSTTransformer):
+# `requests` attributes and their `httpx` counterparts
+REQUESTS_TO_HTTPX = {
+    "Session": "AsyncClient",
+    "ConnectionError": "NetworkError",
+    "Timeout": "TimeoutException",
+}
+
+# sync helpers and their async counterparts
+SYNC_TO_ASYNC_NAMES = {
+    "bounded_map": "async_bounded_map",
+    "create_session": "create_async_session",
+    "spawn": "async_spawn",
+    "FilesOpener": "AsyncFilesOpener",
+    "multipart_kwargs": "async_multipart_kwargs",
+    "file_hash": "async_file_hash",
+    "call_blocking": "async_call_blocking",
+}
+
+# sync helpers whose async counterparts are coroutine functions
+AWAITED_HELPERS = {"file_hash", "call_blocking"}
+
+# sync context managers whose async counterparts are used with `async with`
+ASYNC_CONTEXT_MANAGERS = {"FilesOpener"}
+
+# methods with different names in async api, these are always async
+METHOD_RENAMES = {
+    "close": "aclose",
+    "__enter__": "__aenter__",
+    "__exit__": "__aexit__",
+}
+
+# sync helpers returning iterators, looped over with `async for`
+ASYNC_ITERATORS = {"bounded_map"}
+
+# blocking calls replaced with awaited coroutines
+BLOCKING_TO_ASYNC = {
+    ("time", "sleep"): ("asyncio", "sleep"),
+}
+
+
+class FunctionState:
     def __init__(self):
-        self.stack = []
-        self.fn_should_async = None
+        self.is_async = False
+        self.has_yield = False
+        self.context_managers = set()  # names bound to ASYNC_CONTEXT_MANAGERS
+
+
+def creates_async_context_manager(node: cst.CSTNode):
+    return bool(m.findall(node, m.Call(func=m.OneOf(
+        *(m.Name(name) for name in ASYNC_CONTEXT_MANAGERS)
+    ))))
+
+
+def parenthesize_await(node):
+    """`(await x).attr` and `(await x)[key]`"""
+    if not isinstance(node.value, cst.Await):
+        return node
+
+    return node.with_changes(
+        value=node.value.with_changes(
+            lpar=[cst.LeftParen()],
+            rpar=[cst.RightParen()],
+        )
+    )
+
+
+def is_unused_import(statement, module: cst.Module):
+    """`import time` with no `time.` left after replacing blocking calls"""
+    if not m.matches(statement, m.SimpleStatementLine(body=[m.Import()])):
+        return False
+
+    names = [alias.name for alias in statement.body[0].names]
+    blocking_modules = {path[0] for path in BLOCKING_TO_ASYNC}
+
+    if not all(
+        isinstance(name, cst.Name) and name.value in blocking_modules
+        for name in names
+    ):
+        return False
+
+    return not any(
+        m.findall(module, m.Attribute(value=m.Name(name.value)))
+        for name in names
+    )
+
+
+def get_call_path(call: cst.Call):
+    """`self.session.post(...)` -> ["self", "session", "post"]"""
+    path = []
+
+    a = call.func
+    while isinstance(a, cst.Attribute) or isinstance(a, cst.Name):
+        if isinstance(a, cst.Attribute):
+            path.append(a.attr.value)
+        else:
+            path.append(a.value)
+            break
+        a = a.value
+    else:
+        return []
+
+    return path[::-1]
+
+
+class SyncToAsyncTransformer(cst.CSTTransformer):
+    """
+    :param async_methods: {class name: names of methods known to be async}
+    :param async_generators: {class name: names of async generator methods}
+    """
+
+    def __init__(self, async_methods, async_generators):
+        self.async_methods = async_methods
+        self.async_generators = async_generators
+        self.found_async_methods = {}
+        self.found_async_generators = {}
+
+        self.classes = []
+        self.functions = []  # FunctionState for each function being visited
+        self.uses_asyncio = False
 
     # PATH MAKING
     def visit_ClassDef(self, node: cst.ClassDef) -> Optional[bool]:
-        self.stack.append(node.name.value)
+        self.classes.append(node.name.value)
 
     def leave_ClassDef(
         self, original_node: cst.ClassDef, updated_node: cst.ClassDef
     ) -> cst.CSTNode:
-        self.stack.pop()
+        self.classes.pop()
         return updated_node
 
     def visit_FunctionDef(self, node: cst.FunctionDef) -> Optional[bool]:
-        self.stack.append(node.name.value)
+        self.functions.append(FunctionState())
+
+    def visit_Yield(self, node: cst.Yield) -> Optional[bool]:
+        self.functions[-1].has_yield = True
+
+    def visit_Assign(self, node: cst.Assign) -> Optional[bool]:
+        if not self.functions or not creates_async_context_manager(node.value):
+            return
+
+        for target in node.targets:
+            if isinstance(target.target, cst.Name):
+                self.functions[-1].context_managers.add(target.target.value)
 
     # END PATH MAKING
 
@@ -38,89 +170,265 @@ class SyncToAsyncTransformer(cst.CSTTransformer):
 
         return updated_node
 
+    def leave_Name(
+        self, original_node: cst.Name, updated_node: cst.Name
+    ) -> cst.CSTNode:
+        """Replace sync helpers with async ones"""
+
+        if original_node.value in SYNC_TO_ASYNC_NAMES:
+            return updated_node.with_changes(
+                value=SYNC_TO_ASYNC_NAMES[original_node.value]
+            )
+
+        return updated_node
+
     def leave_Attribute(
         self, original_node: cst.Attribute, updated_node: cst.Attribute
     ) -> cst.CSTNode:
         """Replace requests attrs with httpx attrs"""
 
+        updated_node = parenthesize_await(updated_node)
+
         if (
             isinstance(original_node.value, cst.Name)
             and original_node.value.value == "requests"
         ):
-            mapping = {"Session": "AsyncClient"}
-
             return updated_node.with_changes(
                 value=cst.Name("httpx"),
-                attr=cst.Name(mapping[original_node.attr.value]),
+                attr=cst.Name(REQUESTS_TO_HTTPX[original_node.attr.value]),
             )
 
         return updated_node
 
-    def leave_Call(self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef):
-        """Await calls to `method` of TelegraphApi"""
-        path = []
+    def leave_Subscript(
+        self, original_node: cst.Subscript, updated_node: cst.Subscript
+    ) -> cst.CSTNode:
+        """Keep subscripts of awaited calls outside of the await"""
+        return parenthesize_await(updated_node)
 
-        a = original_node.func
-        while isinstance(a, cst.Attribute) or isinstance(a, cst.Name):
-            if isinstance(a, cst.Attribute):
-                path.append(a.attr.value)
-            else:
-                path.append(a.value)
-            a = a.value
-
-        # await the call if it's API class method
-        should_await = (
-            path[-2:] == ["session", "self"]
-            or path[-3:] == [
-                "method",
-                "_telegraph",
-                "self",
-            ]
-            or path[-3:] == [
-                "upload_file",
-                "_telegraph",
-                "self",
-            ]
+    def get_method(self, path):
+        """ `self.x(...)` -> (current class, "x"),
+            `self._telegraph.x(...)` -> ("TelegraphApi", "x")
+        """
+        if len(path) == 2 and path[0] == "self" and self.classes:
+            return self.classes[-1], path[1]
+
+        if len(path) == 3 and path[:2] == ["self", "_telegraph"]:
+            return "TelegraphApi", path[2]
+
+        return None, None
+
+    def is_async_call(self, path):
+        cls, name = self.get_method(path)
+
+        return (
+            path[:2] == ["self", "session"]
+            or (len(path) == 1 and path[0] in AWAITED_HELPERS)
+            or name in self.async_methods.get(cls, ())
         )
-        if not should_await:
+
+    def is_async_iterator_call(self, path):
+        cls, name = self.get_method(path)
+
+        return (
+            (len(path) == 1 and path[0] in ASYNC_ITERATORS)
+            or name in self.async_generators.get(cls, ())
+        )
+
+    def mark_async(self):
+        """Mark current fn as async on leave"""
+        if self.functions:
+            self.functions[-1].is_async = True
+
+    def leave_Call(self, original_node: cst.Call, updated_node: cst.Call):
+        """Await calls to async methods and replace blocking calls"""
+        path = get_call_path(original_node)
+
+        if tuple(path) in BLOCKING_TO_ASYNC:
+            module, attr = BLOCKING_TO_ASYNC[tuple(path)]
+            self.uses_asyncio = self.uses_asyncio or module == "asyncio"
+            updated_node = updated_node.with_changes(
+                func=cst.Attribute(value=cst.Name(module), attr=cst.Name(attr))
+            )
+        elif (
+            not self.is_async_call(path)
+            or self.is_async_iterator_call(path)
+        ):
             return updated_node
+        elif path[-1] in METHOD_RENAMES:
+            updated_node = updated_node.with_changes(
+                func=updated_node.func.with_changes(
+                    attr=cst.Name(METHOD_RENAMES[path[-1]])
+                )
+            )
 
-        self.fn_should_async = self.stack  # mark current fn as async on leave
+        self.mark_async()
         # await the call
-        return Await(
-            updated_node,
-            lpar=[cst.LeftParen()],
-            rpar=[cst.RightParen()],
+        return cst.Await(updated_node)
+
+    def leave_For(self, original_node: cst.For, updated_node: cst.For):
+        """Loop over async iterators with `async for`"""
+        if not isinstance(original_node.iter, cst.Call):
+            return updated_node
+
+        if not self.is_async_iterator_call(get_call_path(original_node.iter)):
+            return updated_node
+
+        self.mark_async()
+        return updated_node.with_changes(asynchronous=cst.Asynchronous())
+
+    def leave_CompFor(
+        self, original_node: cst.CompFor, updated_node: cst.CompFor
+    ):
+        """Comprehensions over async iterators use `async for` too"""
+        if not isinstance(original_node.iter, cst.Call):
+            return updated_node
+
+        if not self.is_async_iterator_call(get_call_path(original_node.iter)):
+            return updated_node
+
+        self.mark_async()
+        return updated_node.with_changes(asynchronous=cst.Asynchronous())
+
+    def leave_With(self, original_node: cst.With, updated_node: cst.With):
+        """Use async context managers with `async with`"""
+        context_managers = (
+            self.functions[-1].context_managers if self.functions else ()
         )
 
+        for item in original_node.items:
+            if (
+                isinstance(item.item, cst.Name)
+                and item.item.value in context_managers
+            ) or (
+                isinstance(item.item, cst.Call)
+                and creates_async_context_manager(item.item)
+            ):
+                break
+        else:
+            return updated_node
+
+        self.mark_async()
+        return updated_node.with_changes(asynchronous=cst.Asynchronous())
+
     def leave_FunctionDef(
         self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef
     ):
-        should_async = self.stack == self.fn_should_async
-        self.fn_should_async = None
-        self.stack.pop()
+        state = self.functions.pop()
+        name = original_node.name.value
+
+        if self.classes and name in METHOD_RENAMES:
+            state.is_async = True
+            updated_node = updated_node.with_changes(
+                name=cst.Name(METHOD_RENAMES[name])
+            )
 
-        if not should_async:
+        if not state.is_async:
             return updated_node
 
+        if self.classes:
+            if state.has_yield:
+                found = self.found_async_generators
+            else:
+                found = self.found_async_methods
+
+            found.setdefault(self.classes[-1], set()).add(name)
+
         # mark fn as async
         return updated_node.with_changes(
             asynchronous=cst.Asynchronous()
         )
 
+    def leave_Module(
+        self, original_node: cst.Module, updated_node: cst.Module
+    ) -> cst.Module:
+        """ Add `import asyncio` before the first import, drop imports of
+            modules whose blocking calls were all replaced
+        """
+        body = [
+            statement for statement in updated_node.body
+            if not is_unused_import(statement, updated_node)
+        ]
 
-def main():
-    with open("telegraph/api.py") as f:
-        py_source = f.read()
+        if not self.uses_asyncio:
+            return updated_node.with_changes(body=body)
+
+        for i, statement in enumerate(body):
+            if isinstance(statement, cst.SimpleStatementLine) and isinstance(
+                statement.body[0], (cst.Import, cst.ImportFrom)
+            ):
+                break
+        else:
+            i = 0
+
+        body.insert(i, cst.parse_statement("import asyncio\n"))
+
+        return updated_node.with_changes(body=body)
 
+
+def generate(py_source):
     source_tree = cst.parse_module(py_source)
 
-    transformer = SyncToAsyncTransformer()
-    modified_tree = source_tree.visit(transformer)
+    # methods calling async methods become async too, repeat until stable
+    async_methods = {}
+    async_generators = {}
+    while True:
+        transformer = SyncToAsyncTransformer(async_methods, async_generators)
+        modified_tree = source_tree.visit(transformer)
+
+        if (
+            transformer.found_async_methods == async_methods
+            and transformer.found_async_generators == async_generators
+        ):
+            return modified_tree.code
+
+        async_methods = transformer.found_async_methods
+        async_generators = transformer.found_async_generators
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SYNC_PATH = os.path.join(ROOT, "telegraph", "api.py")
+ASYNC_PATH = os.path.join(ROOT, "telegraph", "aio.py")
+
+
+def is_up_to_date():
+    """True if telegraph/aio.py matches the generated code"""
+    with open(SYNC_PATH) as f:
+        py_source = f.read()
+
+    try:
+        with open(ASYNC_PATH) as f:
+            return f.read() == generate(py_source)
+    except FileNotFoundError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--check", action="store_true",
+        help="exit with status 1 if telegraph/aio.py is out of date"
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        if is_up_to_date():
+            return 0
+
+        print(
+            "telegraph/aio.py is out of date, "
+            "run `python generate_async_api.py`"
+        )
+        return 1
+
+    with open(SYNC_PATH) as f:
+        py_source = f.read()
+
+    with open(ASYNC_PATH, "w") as f:
+        f.write(generate(py_source))
 
-    with open("telegraph/aio.py", "w") as f:
-        f.write(modified_tree.code)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
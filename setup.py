@@ -43,6 +43,8 @@ setup(
     install_requires=['requests'],
     extras_require={
         'aio': ['httpx'],
+        'http2': ['httpx[http2]'],
+        'fast': ['orjson'],
     },
 
     classifiers=[
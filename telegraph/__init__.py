@@ -11,5 +11,44 @@ Copyright (C) 2018
 __author__ = 'python273'
 __version__ = '2.2.0'
 
-from .api import Telegraph, TelegraphException
-from .upload import upload_file
+import importlib
+
+__all__ = ['Telegraph', 'TelegraphException', 'upload_file']
+
+# Resolved on first access, so `import telegraph.utils` or `telegraph.aio`
+# doesn't import requests
+_LAZY_ATTRS = {
+    'Telegraph': '.api',
+    'TelegraphException': '.exceptions',
+    'upload_file': '.upload',
+}
+
+# submodules imported on first access as attributes (`telegraph.utils`),
+# except aio and testing which have to be imported explicitly
+_LAZY_SUBMODULES = {
+    'adapters', 'analytics', 'api', 'batch', 'cache', 'exceptions', 'hooks',
+    'jsonlib', 'media', 'nodes', 'profiling', 'ratelimit', 'retry',
+    'session', 'state', 'upload', 'utils',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        # the import sets the attribute on the package
+        return importlib.import_module('.' + name, __name__)
+
+    module = _LAZY_ATTRS.get(name)
+
+    if module is None:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name)
+        )
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | _LAZY_SUBMODULES)
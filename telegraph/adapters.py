@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from requests.adapters import HTTPAdapter
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """ `HTTPAdapter` with a default timeout for requests sent without one
+
+    :param timeout: Timeout in seconds (float or (connect, read)),
+                    None for no timeout
+    :param kwargs: `HTTPAdapter` arguments
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['timeout']
+
+    def __init__(self, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+
+        return super().send(request, timeout=timeout, **kwargs)
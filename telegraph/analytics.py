@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+View counts of many pages over a date range, see
+:meth:`telegraph.api.Telegraph.get_views_series`::
+
+    telegraph = Telegraph(token, views_cache=ViewsCache())
+    series = telegraph.get_views_series(
+        paths, date(2024, 1, 1), date(2024, 1, 31), 'hour'
+    )  # every hour of January
+
+    for start, views in series[path]:
+        ...
+
+Periods are in UTC. Views of a period don't change once it's over, so
+:class:`ViewsCache` keeps them for good and only periods that may still
+be counted are requested again.
+"""
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+
+GRANULARITIES = ('year', 'month', 'day', 'hour')
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _to_utc(value):
+    if not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value
+
+
+def _next_period(start, granularity):
+    if granularity == 'hour':
+        return start + timedelta(hours=1)
+
+    if granularity == 'day':
+        return start + timedelta(days=1)
+
+    if granularity == 'month':
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+
+        return start.replace(month=start.month + 1)
+
+    return start.replace(year=start.year + 1)
+
+
+def period_args(start, granularity):
+    """ (year, month, day, hour) arguments of get_views for the period,
+        None for the parts finer than `granularity`
+    """
+    parts = (start.year, start.month, start.day, start.hour)
+    count = GRANULARITIES.index(granularity) + 1
+
+    return parts[:count] + (None,) * (4 - count)
+
+
+def period_end(year, month=None, day=None, hour=None):
+    """End of the period given by get_views arguments as UTC datetime"""
+    if hour is not None:
+        return datetime(year, month, day, hour) + timedelta(hours=1)
+
+    if day is not None:
+        return datetime(year, month, day) + timedelta(days=1)
+
+    if month is not None:
+        return _next_period(datetime(year, month, 1), 'month')
+
+    return datetime(year + 1, 1, 1)
+
+
+def iter_periods(start, end, granularity='hour'):
+    """ Starts of the periods from the one containing `start` up to the one
+        containing `end` (inclusive) as naive UTC datetimes
+
+    :param start: datetime or date, naive values are treated as UTC
+    :param end: datetime or date, a date includes the whole day
+    :param granularity: 'year', 'month', 'day' or 'hour'
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError('Unknown granularity: {!r}'.format(granularity))
+
+    year, month, day, hour = period_args(_to_utc(start), granularity)
+    current = datetime(year, month or 1, day or 1, hour or 0)
+
+    if isinstance(end, datetime):
+        end = _to_utc(end)
+    else:
+        # last moment of the day
+        end = _to_utc(end) + timedelta(days=1, microseconds=-1)
+
+    while current <= end:
+        yield current
+        current = _next_period(current, granularity)
+
+
+class ViewsSeries:
+    """ Views of a page per period, stored in arrays
+
+    :param path: Page path
+    :param granularity: 'year', 'month', 'day' or 'hour'
+    :param starts: array('q') of period starts as UTC timestamps, shared by
+                   the series of a :meth:`get_views_series` call
+    :param views: array('q') of views, same length as `starts`
+    """
+
+    __slots__ = ('path', 'granularity', 'starts', 'views')
+
+    def __init__(self, path, granularity, starts, views):
+        self.path = path
+        self.granularity = granularity
+        self.starts = starts
+        self.views = views
+
+    def __len__(self):
+        return len(self.views)
+
+    def __iter__(self):
+        """Yields (period start as naive UTC datetime, views)"""
+        for start, views in zip(self.starts, self.views):
+            yield EPOCH + timedelta(seconds=start), views
+
+    def total(self):
+        return sum(self.views)
+
+    def __repr__(self):
+        return 'ViewsSeries({!r}, {!r}, {} periods, {} views)'.format(
+            self.path, self.granularity, len(self), self.total()
+        )
+
+
+class ViewsCache:
+    """ Views of finished periods, kept until the process exits.
+        Thread-safe, one instance can be shared by sync and async clients
+
+    :param settle_after: Seconds after the end of a period (in UTC) before
+                         its views are cached. The default day covers
+                         the time zone of the stats and late counting
+    """
+
+    def __init__(self, settle_after=24 * 3600):
+        self.settle_after = settle_after
+
+        self._lock = threading.Lock()
+        self._views = {}  # (path, year, month, day, hour) -> views
+
+    def __len__(self):
+        return len(self._views)
+
+    def get(self, path, year, month=None, day=None, hour=None):
+        """Returns cached views, None if missing"""
+        with self._lock:
+            return self._views.get((path, year, month, day, hour))
+
+    def set(self, path, views, year, month=None, day=None, hour=None):
+        """Cache views if the period is over, returns True if cached"""
+        end = period_end(year, month, day, hour)
+        settled = (end - EPOCH).total_seconds() + self.settle_after
+
+        if settled > time.time():
+            return False
+
+        with self._lock:
+            self._views[(path, year, month, day, hour)] = views
+
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+def new_series(paths, periods, granularity):
+    """ {path: :class:`ViewsSeries`} of the periods with zero views,
+        all series share the array of period starts
+    """
+    starts = array('q', (
+        int((start - EPOCH).total_seconds()) for start in periods
+    ))
+    zeros = array('q', [0]) * len(periods)
+
+    return {
+        path: ViewsSeries(path, granularity, starts, array('q', zeros))
+        for path in paths
+    }
@@ -1,10 +1,25 @@
 # -*- coding: utf-8 -*-
-import json
+import functools
+import math
+import time
+from collections.abc import Mapping
 
 import requests
 
+from .analytics import iter_periods, new_series, period_args
+from .batch import bounded_map, call_blocking, spawn
 from .exceptions import TelegraphException, RetryAfterError
-from .utils import html_to_nodes, nodes_to_html, FilesOpener, json_dumps
+from .hooks import RequestEvent, payload_size
+from .jsonlib import json_dumps, load_response
+from .media import iter_media_srcs, media_file, replace_media_srcs
+from .profiling import timed
+from .retry import flood_deadlines
+from .session import create_session
+from .state import page_hash
+from .utils import (
+    html_to_nodes, nodes_to_html, FilesOpener, multipart_kwargs,
+    file_hash
+)
 
 
 class TelegraphApi:
@@ -14,14 +29,54 @@ class TelegraphApi:
     :type access_token: str
 
     :param domain: domain (e.g. alternative mirror graph.org)
+
+    :param retry: retry policy, requests aren't retried by default
+    :type retry: telegraph.retry.RetryPolicy
+
+    :param rate_limiter: client-side rate limiter, can be shared by clients
+    :type rate_limiter: telegraph.ratelimit.RateLimiter
+
+    :param session: HTTP session (`requests.Session`, `httpx.AsyncClient`
+                    for telegraph.aio) or any object with a compatible
+                    `post` method (see :mod:`telegraph.testing`),
+                    the client doesn't close it
+    :param session_options: options for the session created by the client
+                            (see :mod:`telegraph.session`)
+    :type session_options: dict
+
+    :param hooks: observers of requests (see :mod:`telegraph.hooks`)
+    :type hooks: list of telegraph.hooks.RequestHooks
     """
 
-    __slots__ = ('access_token', 'domain', 'session')
+    __slots__ = (
+        'access_token', 'domain', 'session', 'owns_session', 'retry',
+        'rate_limiter', 'hooks'
+    )
 
-    def __init__(self, access_token=None, domain='telegra.ph'):
+    def __init__(self, access_token=None, domain='telegra.ph', retry=None,
+                 rate_limiter=None, session=None, session_options=None,
+                 hooks=None):
         self.access_token = access_token
         self.domain = domain
-        self.session = requests.Session()
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.hooks = list(hooks or ())
+
+        self.owns_session = session is None
+        if self.owns_session:
+            session = create_session(**(session_options or {}))
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the session if it was created by the client"""
+        if self.owns_session:
+            self.session.close()
 
     def method(self, method, values=None, path=''):
         values = values.copy() if values is not None else {}
@@ -29,34 +84,30 @@ class TelegraphApi:
         if 'access_token' not in values and self.access_token:
             values['access_token'] = self.access_token
 
-        response = self.session.post(
+        response = self._request(
             'https://api.{}/{}/{}'.format(self.domain, method, path),
-            data=values
-        ).json()
+            data=values, name=method
+        )
 
         if response.get('ok'):
             return response['result']
 
-        error = response.get('error')
-        if isinstance(error, str) and error.startswith('FLOOD_WAIT_'):
-            retry_after = int(error.rsplit('_', 1)[-1])
-            raise RetryAfterError(retry_after)
-        else:
-            raise TelegraphException(error)
+        raise TelegraphException(response.get('error'))
 
     def upload_file(self, f):
         """ Upload file. NOT PART OF OFFICIAL API, USE AT YOUR OWN RISK
             Returns a list of dicts with `src` key.
             Allowed only .jpg, .jpeg, .png, .gif and .mp4 files.
 
-        :param f: filename or file-like object.
-        :type f: file, str or list
+        :param f: filename or file-like object, (file, filename) or
+                  (file, filename, mimetype) tuple to override detection
+                  by content and filename. A list to upload several files.
+        :type f: file, str, tuple or list
         """
-        with FilesOpener(f) as files:
-            response = self.session.post(
-                'https://{}/upload'.format(self.domain),
-                files=files
-            ).json()
+        response = self._request(
+            'https://{}/upload'.format(self.domain),
+            files=f, name='upload'
+        )
 
         if isinstance(response, list):
             error = response[0].get('error')
@@ -64,26 +115,163 @@ class TelegraphApi:
             error = response.get('error')
 
         if error:
-            if isinstance(error, str) and error.startswith('FLOOD_WAIT_'):
-                retry_after = int(error.rsplit('_',1)[-1])
-                raise RetryAfterError(retry_after)
-            else:
-                raise TelegraphException(error)
+            raise TelegraphException(error)
 
         return response
 
+    def _request(self, url, data=None, files=None, name=None):
+        """ Send a request applying the retry policy, FLOOD_WAIT errors
+            are raised as RetryAfterError
+        """
+        flood_key = (self.domain, self.access_token)
+        files_opener = FilesOpener(files) if files is not None else None
+        attempt = 0
+
+        while True:
+            if self.retry is not None:
+                delay = self.retry.flood_delay(
+                    self._check_flood_deadline(flood_key)
+                )
+                if delay:
+                    time.sleep(delay)
+
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve(flood_key)
+                if delay:
+                    time.sleep(delay)
+
+            event = None
+            if self.hooks:
+                event = RequestEvent(name, url, attempt, payload_size(data))
+                self._run_hooks('before_request', event)
+
+            try:
+                if files_opener is None:
+                    with timed('network'):
+                        http_response = self.session.post(url, data=data)
+                else:
+                    with files_opener as opened_files:
+                        if event is not None:
+                            event.bytes_sent = payload_size(files=opened_files)
+
+                        with timed('network'):
+                            http_response = self.session.post(
+                                url, **multipart_kwargs(opened_files)
+                            )
+
+                with timed('deserialization'):
+                    response = load_response(http_response)
+
+                if isinstance(response, list):
+                    error = response[0].get('error')
+                else:
+                    error = response.get('error')
+
+                if event is not None:
+                    event.finish(http_response)
+
+                if isinstance(error, str) and error.startswith('FLOOD_WAIT_'):
+                    retry_after = int(error.rsplit('_', 1)[-1])
+                    raise RetryAfterError(retry_after)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_success(flood_key)
+
+                if event is not None:
+                    self._run_hooks('after_response', event, response)
+
+                return response
+
+            except RetryAfterError as e:
+                self._on_error(event, e)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_flood_wait(flood_key)
+
+                # shared even if this request gives up, so that other
+                # clients using the token wait instead of sending
+                flood_deadlines.defer(flood_key, e.retry_after)
+
+                if (self.retry is None
+                        or attempt >= self.retry.max_retries
+                        or e.retry_after > self.retry.max_retry_after):
+                    raise
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._on_error(event, e)
+
+                if self.retry is None or attempt >= self.retry.max_retries:
+                    raise
+
+                time.sleep(self.retry.backoff(attempt))
+
+            except Exception as e:
+                self._on_error(event, e)
+                raise
+
+            attempt += 1
+
+    def _run_hooks(self, name, event, *args):
+        for hooks in self.hooks:
+            getattr(hooks, name)(event, *args)
+
+    def _on_error(self, event, error):
+        if event is None:
+            return
+
+        if event.elapsed is None:
+            event.finish()
+
+        self._run_hooks('on_error', event, error)
+
+    def _check_flood_deadline(self, flood_key):
+        remaining = flood_deadlines.remaining(flood_key)
+
+        if remaining > self.retry.max_retry_after:
+            raise RetryAfterError(math.ceil(remaining))
+
+        return remaining
+
 
 class Telegraph:
     """ Telegraph API client helper
 
     :param access_token: access token
     :param domain: domain (e.g. alternative mirror graph.org)
+    :param page_cache: cache of :meth:`get_page` responses, invalidated by
+                       :meth:`edit_page`, can be shared by clients
+    :type page_cache: telegraph.cache.PageCache or
+                      telegraph.cache.SqlitePageCache
+    :param state_store: last known state of pages, :meth:`edit_page` calls
+                        that wouldn't change the page are skipped
+    :type state_store: telegraph.state.MemoryStateStore or
+                       telegraph.state.JsonFileStateStore
+    :param views_cache: views of finished periods returned by
+                        :meth:`get_views`, can be shared by clients
+    :type views_cache: telegraph.analytics.ViewsCache
+    :param kwargs: :class:`TelegraphApi` options (retry, rate_limiter,
+                   session, session_options, hooks)
     """
 
-    __slots__ = ('_telegraph',)
+    __slots__ = ('_telegraph', 'page_cache', 'state_store', 'views_cache')
 
-    def __init__(self, access_token=None, domain='telegra.ph'):
-        self._telegraph = TelegraphApi(access_token, domain)
+    def __init__(self, access_token=None, domain='telegra.ph',
+                 page_cache=None, state_store=None, views_cache=None,
+                 **kwargs):
+        self._telegraph = TelegraphApi(access_token, domain, **kwargs)
+        self.page_cache = page_cache
+        self.state_store = state_store
+        self.views_cache = views_cache
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the session if it was created by the client"""
+        self._telegraph.close()
 
     def get_access_token(self):
         """Get current access_token"""
@@ -154,17 +342,43 @@ class Telegraph:
         :param return_content: If true, content field will be returned
         :param return_html: If true, returns HTML instead of Nodes list
         """
+        if self.page_cache is None:
+            return self._fetch_page(path, return_content, return_html)
+
+        cache_key = (path, bool(return_content), bool(return_html))
+        response, refresh = call_blocking(self.page_cache.lookup, cache_key)
+
+        if response is None:
+            response = self._fetch_page(path, return_content, return_html)
+            call_blocking(self.page_cache.set, cache_key, response)
+        elif refresh:
+            spawn(self._refresh_page, cache_key)
+
+        return response
+
+    def _fetch_page(self, path, return_content, return_html):
         response = self._telegraph.method('getPage', path=path, values={
             'return_content': return_content
         })
 
         if return_content and return_html:
-            response['content'] = nodes_to_html(response['content'])
+            with timed('response_conversion'):
+                response['content'] = nodes_to_html(response['content'])
 
         return response
 
+    def _refresh_page(self, cache_key):
+        try:
+            response = self._fetch_page(*cache_key)
+        except Exception:
+            # keep serving the cached page, refreshed on the next lookup
+            self.page_cache.end_refresh(cache_key)
+        else:
+            call_blocking(self.page_cache.set, cache_key, response)
+
     def create_page(self, title, content=None, html_content=None,
-                    author_name=None, author_url=None, return_content=False):
+                    author_name=None, author_url=None, return_content=False,
+                    upload_media=False, media_root=None):
         """ Create a new Telegraph page
 
         :param title: Page title
@@ -174,13 +388,42 @@ class Telegraph:
         :param author_url: Profile link, opened when users click on
                            the author's name below the title
         :param return_content: If true, a content field will be returned
+        :param upload_media: If true, images and videos with local files or
+                             data URIs as src are uploaded concurrently and
+                             their src replaced. A mapping (even empty) is
+                             used as `uploaded` of :meth:`upload_batch`, to
+                             reuse uploads across pages. None and other
+                             false values disable uploads. Only for trusted
+                             content: any readable file can be uploaded
+        :param media_root: Directory relative media paths are resolved
+                           against, the working directory by default
         """
         if content is None:
-            content = html_to_nodes(html_content)
+            with timed('conversion'):
+                content = html_to_nodes(html_content)
+
+        media = media_hashes = None
+        if upload_media or isinstance(upload_media, Mapping):
+            media = self._media_files(content, media_root)
+
+        with timed('serialization'):
+            content_json = json_dumps(content)
 
-        content_json = json_dumps(content)
+        if self.state_store is not None:
+            media_hashes = self._media_hashes(media)
+            new_hash = page_hash(
+                title, content_json, author_name, author_url, media_hashes
+            )
 
-        return self._telegraph.method('createPage', values={
+        if media:
+            content = self._upload_media(
+                content, media, upload_media, media_hashes
+            )
+
+            with timed('serialization'):
+                content_json = json_dumps(content)
+
+        response = self._telegraph.method('createPage', values={
             'title': title,
             'author_name': author_name,
             'author_url': author_url,
@@ -188,8 +431,33 @@ class Telegraph:
             'return_content': return_content
         })
 
+        if self.state_store is not None:
+            call_blocking(
+                self.state_store.set, response['path'], new_hash, response
+            )
+
+        return response
+
+    def create_pages(self, pages, concurrency=4, ordered=True):
+        """ Create many pages concurrently, sharing the connection pool.
+            Returns an iterator of :class:`telegraph.batch.BatchResult`,
+            errors are reported per page instead of aborting the batch
+
+        :param pages: Iterable of dicts with :meth:`create_page` arguments
+        :param concurrency: Maximum number of requests at once
+        :param ordered: If true, results are yielded in input order,
+                        otherwise as soon as they are completed
+        """
+        return bounded_map(
+            self._create_page_from_kwargs, pages, concurrency, ordered
+        )
+
+    def _create_page_from_kwargs(self, kwargs):
+        return self.create_page(**kwargs)
+
     def edit_page(self, path, title, content=None, html_content=None,
-                  author_name=None, author_url=None, return_content=False):
+                  author_name=None, author_url=None, return_content=False,
+                  upload_media=False, media_root=None):
         """ Edit an existing Telegraph page
 
         :param path: Path to the page
@@ -200,13 +468,51 @@ class Telegraph:
         :param author_url: Profile link, opened when users click on
                            the author's name below the title
         :param return_content: If true, a content field will be returned
+        :param upload_media: If true, images and videos with local files or
+                             data URIs as src are uploaded concurrently and
+                             their src replaced. A mapping (even empty) is
+                             used as `uploaded` of :meth:`upload_batch`, to
+                             reuse uploads across pages. None and other
+                             false values disable uploads. Only for trusted
+                             content: any readable file can be uploaded
+        :param media_root: Directory relative media paths are resolved
+                           against, the working directory by default
+
+        With `state_store`, the request is skipped and the last result is
+        returned if the page wouldn't change. The check is done before
+        uploading media, by the content hash of the files
         """
         if content is None:
-            content = html_to_nodes(html_content)
+            with timed('conversion'):
+                content = html_to_nodes(html_content)
+
+        media = media_hashes = None
+        if upload_media or isinstance(upload_media, Mapping):
+            media = self._media_files(content, media_root)
+
+        with timed('serialization'):
+            content_json = json_dumps(content)
+
+        if self.state_store is not None:
+            media_hashes = self._media_hashes(media)
+            new_hash = page_hash(
+                title, content_json, author_name, author_url, media_hashes
+            )
+            state = self.state_store.get(path)
 
-        content_json = json_dumps(content)
+            if state is not None and state[0] == new_hash:
+                if not return_content or 'content' in state[1]:
+                    return dict(state[1])
 
-        return self._telegraph.method('editPage', path=path, values={
+        if media:
+            content = self._upload_media(
+                content, media, upload_media, media_hashes
+            )
+
+            with timed('serialization'):
+                content_json = json_dumps(content)
+
+        response = self._telegraph.method('editPage', path=path, values={
             'title': title,
             'author_name': author_name,
             'author_url': author_url,
@@ -214,6 +520,16 @@ class Telegraph:
             'return_content': return_content
         })
 
+        if self.page_cache is not None:
+            call_blocking(self.page_cache.invalidate, path)
+
+        if self.state_store is not None:
+            call_blocking(
+                self.state_store.set, path, new_hash, response
+            )
+
+        return response
+
     def get_account_info(self, fields=None):
         """ Get information about a Telegraph account
 
@@ -240,6 +556,46 @@ class Telegraph:
             'limit': limit
         })
 
+    def iter_pages(self, limit=200, prefetch=1):
+        """ Iterate over all pages of the account sorted by most recently
+            created pages first. Next windows of pages are requested while
+            the current one is being processed
+
+        :param limit: Number of pages requested at once (1-200, default = 200)
+        :param prefetch: Number of windows requested ahead (default = 1)
+        """
+        if not 1 <= limit <= 200:
+            raise ValueError('limit must be 1-200, got {!r}'.format(limit))
+
+        if prefetch < 0:
+            raise ValueError(
+                'prefetch must be 0 or more, got {!r}'.format(prefetch)
+            )
+
+        total_count = None
+
+        def offsets():
+            offset = 0
+            while total_count is None or offset < total_count:
+                yield offset
+                offset += limit
+
+        get_page_list = functools.partial(self.get_page_list, limit=limit)
+
+        for window in bounded_map(
+            get_page_list, offsets(), concurrency=prefetch + 1
+        ):
+            if window.error is not None:
+                raise window.error
+
+            total_count = window.result['total_count']
+
+            for page in window.result['pages']:
+                yield page
+
+            if len(window.result['pages']) < limit:
+                break
+
     def get_views(self, path, year=None, month=None, day=None, hour=None):
         """ Get the number of views for a Telegraph article
 
@@ -252,20 +608,216 @@ class Telegraph:
                     page views for the requested day will be returned
         :param hour: If passed, the number of page views for
                      the requested hour will be returned
+
+        With `views_cache`, views of finished periods are requested once
         """
-        return self._telegraph.method('getViews', path=path, values={
+        cache = self.views_cache if year is not None else None
+
+        if cache is not None:
+            views = cache.get(path, year, month, day, hour)
+
+            if views is not None:
+                return {'views': views}
+
+        response = self._telegraph.method('getViews', path=path, values={
             'year': year,
             'month': month,
             'day': day,
             'hour': hour
         })
 
+        if cache is not None:
+            cache.set(path, response['views'], year, month, day, hour)
+
+        return response
+
+    def get_views_series(self, paths, start, end, granularity='hour',
+                         concurrency=8):
+        """ Views of pages per period from `start` to `end`, requested
+            concurrently.
+            Returns {path: :class:`telegraph.analytics.ViewsSeries`}
+
+        :param paths: Iterable of page paths
+        :param start: datetime or date of the first period, naive values
+                      are treated as UTC
+        :param end: datetime or date of the last period (inclusive),
+                    a date includes the whole day
+        :param granularity: 'year', 'month', 'day' or 'hour'
+        :param concurrency: Maximum number of requests at once
+        """
+        periods = list(iter_periods(start, end, granularity))
+        series = new_series(paths, periods, granularity)
+        pending = []  # (path, period index, get_views arguments)
+
+        for path, path_series in series.items():
+            for i, period in enumerate(periods):
+                args = period_args(period, granularity)
+                views = None
+
+                if self.views_cache is not None:
+                    views = self.views_cache.get(path, *args)
+
+                if views is None:
+                    pending.append((path, i, args))
+                else:
+                    path_series.views[i] = views
+
+        error = None
+
+        for result in bounded_map(
+            self._get_views_item, pending, concurrency, ordered=False
+        ):
+            if result.error is not None:
+                error = error or result.error
+                continue
+
+            path, i, _ = result.item
+            series[path].views[i] = result.result
+
+        if error is not None:
+            raise error
+
+        return series
+
+    def _get_views_item(self, item):
+        path, _, args = item
+        return self.get_views(path, *args)['views']
+
     def upload_file(self, f):
         """ Upload file. NOT PART OF OFFICIAL API, USE AT YOUR OWN RISK
             Returns a list of dicts with `src` key.
             Allowed only .jpg, .jpeg, .png, .gif and .mp4 files.
 
-        :param f: filename or file-like object.
-        :type f: file, str or list
+        :param f: filename or file-like object, (file, filename) or
+                  (file, filename, mimetype) tuple to override detection
+                  by content and filename. A list to upload several files.
+        :type f: file, str, tuple or list
         """
         return self._telegraph.upload_file(f)
+
+    def upload_files(self, files, concurrency=4, ordered=True):
+        """ Upload files concurrently, one request per file.
+            Returns an iterator of :class:`telegraph.batch.BatchResult`
+            with :meth:`upload_file` results
+
+        :param files: Iterable of filenames, file-like objects
+                      or (file, filename) tuples
+        :param concurrency: Maximum number of uploads at once
+        :param ordered: If true, results are yielded in input order,
+                        otherwise as soon as they are completed
+        """
+        return bounded_map(self.upload_file, files, concurrency, ordered)
+
+    def upload_batch(self, files, uploaded=None, files_per_request=4,
+                     concurrency=4):
+        """ Upload files skipping the ones uploaded before, files with the
+            same content are uploaded once. The rest is sent in requests of
+            `files_per_request` files, `concurrency` requests at once.
+            Returns dict {file: src}
+
+        :param files: Iterable of filenames, seekable file-like objects
+                      or (file, filename) tuples
+        :param uploaded: Mapping of content hash to src of uploaded files,
+                         updated with new uploads (e.g. a dict kept between
+                         calls or a `shelve`)
+        :param files_per_request: Number of files uploaded in one request
+        :param concurrency: Maximum number of requests at once
+        """
+        hashed = []
+        for f in files:
+            hashed.append((file_hash(f), f))
+
+        return self._upload_hashed(
+            hashed, uploaded, files_per_request, concurrency
+        )
+
+    def _upload_hashed(self, hashed, uploaded=None, files_per_request=4,
+                       concurrency=4):
+        """:meth:`upload_batch` of (content hash, file) pairs"""
+        if uploaded is None:
+            uploaded = {}
+
+        srcs = {}
+        pending = {}  # hash -> files with this content
+
+        for digest, f in hashed:
+            src = uploaded.get(digest)
+
+            if src is not None:
+                srcs[f] = src
+            else:
+                pending.setdefault(digest, []).append(f)
+
+        unique_files = [(digest, fs[0]) for digest, fs in pending.items()]
+        chunks = [
+            unique_files[i:i + files_per_request]
+            for i in range(0, len(unique_files), files_per_request)
+        ]
+        error = None
+
+        for result in bounded_map(
+            self._upload_chunk, chunks, concurrency
+        ):
+            if result.error is not None:
+                error = error or result.error
+                continue
+
+            for digest, src in result.result:
+                uploaded[digest] = src
+
+                for f in pending[digest]:
+                    srcs[f] = src
+
+        if error is not None:
+            raise error
+
+        return srcs
+
+    def _media_files(self, content, media_root):
+        """{src: file} of the media to upload"""
+        files = {}
+
+        for src in iter_media_srcs(content):
+            if src not in files:
+                f = media_file(src, media_root)
+
+                if f is not None:
+                    files[src] = f
+
+        return files
+
+    def _media_hashes(self, files):
+        """ {src: content hash} of the media to upload, so that the state
+            of a page changes with the files and not only their srcs
+        """
+        if not files:
+            return None
+
+        return {src: file_hash(f) for src, f in files.items()}
+
+    def _upload_media(self, content, files, uploaded, hashes=None):
+        """ Upload `files` and replace their srcs in `content`
+
+        :param hashes: {src: content hash} of `files` if already computed,
+                       so that the files aren't read again to hash them
+        """
+        if not isinstance(uploaded, Mapping):
+            uploaded = None
+
+        if hashes is None:
+            hashes = self._media_hashes(files)
+
+        uploaded_srcs = self._upload_hashed(
+            [(hashes[src], f) for src, f in files.items()], uploaded
+        )
+
+        return replace_media_srcs(content, {
+            src: uploaded_srcs[f] for src, f in files.items()
+        })
+
+    def _upload_chunk(self, chunk):
+        response = self.upload_file([f for _, f in chunk])
+        return [
+            (digest, file['src'])
+            for (digest, _), file in zip(chunk, response)
+        ]
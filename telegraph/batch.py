@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import contextvars
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+_background_tasks = set()  # strong references to running async_spawn tasks
+
+BatchResult = namedtuple('BatchResult', ('index', 'item', 'result', 'error'))
+BatchResult.__doc__ = """ Result of a single item of a batch
+
+:param index: Position of the item in the input
+:param item: The item
+:param result: Result, None if failed
+:param error: Exception raised for the item, None if succeeded
+"""
+
+
+def _run(fn, index, item):
+    try:
+        return BatchResult(index, item, fn(item), None)
+    except Exception as e:
+        return BatchResult(index, item, None, e)
+
+
+async def _async_run(fn, index, item):
+    try:
+        return BatchResult(index, item, await fn(item), None)
+    except Exception as e:
+        return BatchResult(index, item, None, e)
+
+
+def bounded_map(fn, items, concurrency=4, ordered=True):
+    """ Call `fn` for every item in a thread pool, at most `concurrency`
+        calls run at once and items are consumed lazily.
+        Yields BatchResult, errors are reported instead of being raised
+
+    :param ordered: Yield results in input order instead of completion order
+    """
+    pending = deque() if ordered else set()
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        try:
+            for index, item in enumerate(items):
+                if len(pending) >= concurrency:
+                    yield from _pop_completed(pending, ordered)
+
+                future = executor.submit(
+                    contextvars.copy_context().run, _run, fn, index, item
+                )
+
+                if ordered:
+                    pending.append(future)
+                else:
+                    pending.add(future)
+
+            while pending:
+                yield from _pop_completed(pending, ordered)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _pop_completed(pending, ordered):
+    if ordered:
+        yield pending.popleft().result()
+        return
+
+    done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+    pending.difference_update(done)
+
+    for future in done:
+        yield future.result()
+
+
+async def async_bounded_map(fn, items, concurrency=4, ordered=True):
+    """ Async version of :func:`bounded_map`, `fn` must be a coroutine
+        function and runs in asyncio tasks
+    """
+    import asyncio
+
+    pending = deque() if ordered else set()
+
+    try:
+        for index, item in enumerate(items):
+            if len(pending) >= concurrency:
+                async for result in _async_pop_completed(pending, ordered):
+                    yield result
+
+            task = asyncio.ensure_future(_async_run(fn, index, item))
+
+            if ordered:
+                pending.append(task)
+            else:
+                pending.add(task)
+
+        while pending:
+            async for result in _async_pop_completed(pending, ordered):
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _async_pop_completed(pending, ordered):
+    if ordered:
+        yield await pending.popleft()
+        return
+
+    import asyncio
+    done, not_done = await asyncio.wait(
+        pending, return_when=asyncio.FIRST_COMPLETED
+    )
+    pending.difference_update(done)
+
+    for task in done:
+        yield task.result()
+
+
+def spawn(fn, *args):
+    """Call `fn` in a background daemon thread"""
+    thread = threading.Thread(target=fn, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def async_spawn(fn, *args):
+    """Run coroutine function `fn` in a background task"""
+    import asyncio
+
+    task = asyncio.ensure_future(fn(*args))
+
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+    return task
+
+
+def call_blocking(fn, *args):
+    """ Call `fn` doing blocking I/O (e.g. writing a file), the async
+        version runs it in the default executor
+    """
+    return fn(*args)
+
+
+async def async_call_blocking(fn, *args):
+    """Run `fn` in the default executor, in a copy of the current context"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+
+    return await loop.run_in_executor(None, context.run, fn, *args)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Caches of :meth:`telegraph.api.Telegraph.get_page` responses keyed by
+(path, return_content, return_html)::
+
+    telegraph = Telegraph(page_cache=PageCache(maxsize=1000, ttl=60))
+
+Responses older than `refresh_after` are still returned, but the page is
+fetched again in the background (once, however many callers ask for it),
+so popular pages don't expire for everyone at the same time.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from .jsonlib import json_dumps, json_loads
+
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+
+def page_keys(path):
+    """All cache keys of the page"""
+    return [
+        (path, return_content, return_html)
+        for return_content in (True, False)
+        for return_html in (True, False)
+    ]
+
+
+class BasePageCache:
+    """ Expiration and refresh bookkeeping shared by the caches
+
+    :param ttl: Seconds a response is cached for, None to keep it until
+                it's evicted or the page is edited
+    :param refresh_after: Seconds after which a cached response is
+                          refreshed in the background, None to disable
+    """
+
+    maxsize = None
+
+    def __init__(self, ttl, refresh_after):
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def lookup(self, key):
+        """ Returns (response, refresh). Response is None if missing or
+            expired. Refresh is true if the response should be refreshed
+            by the caller, which then must call :meth:`set` or
+            :meth:`end_refresh`
+        """
+        now = time.time()
+        entry = self._get_entry(key)
+
+        if entry is not None and self._expired(entry[0], now):
+            self._expire_entry(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            self.hits += 1
+
+            refresh = (
+                self.refresh_after is not None
+                and now - entry[0] >= self.refresh_after
+                and key not in self._refreshing
+            )
+            if refresh:
+                self._refreshing.add(key)
+
+        return entry[1], refresh
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at >= self.ttl
+
+    def _expire_entry(self, key):
+        self._delete_entry(key)
+
+    def get(self, key):
+        """Returns cached response, None if missing or expired"""
+        return self.lookup(key)[0]
+
+    def set(self, key, response):
+        self._set_entry(key, time.time(), response)
+        self.end_refresh(key)
+
+    def end_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, path):
+        """Remove cached responses of the page"""
+        for key in page_keys(path):
+            self._delete_entry(key)
+
+    def info(self):
+        """Returns CacheInfo(hits, misses, maxsize, currsize)"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+
+class PageCache(BasePageCache):
+    """ In-memory LRU cache.
+        Thread-safe, one instance can be shared by sync and async clients.
+
+        Cached responses are shallow copies, their content must not be
+        modified in place.
+
+    :param maxsize: Maximum number of cached responses
+    :param ttl: Seconds a response is cached for, None to keep it until
+                it's evicted or the page is edited
+    :param refresh_after: Seconds after which a cached response is
+                          refreshed in the background, None to disable
+    """
+
+    def __init__(self, maxsize=128, ttl=300, refresh_after=None):
+        super().__init__(ttl, refresh_after)
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (stored_at, response)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(key)
+
+            return entry[0], dict(entry[1])
+
+    def _set_entry(self, key, stored_at, response):
+        with self._lock:
+            self._entries[key] = (stored_at, dict(response))
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _delete_entry(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SqlitePageCache(BasePageCache):
+    """ Persistent cache in a sqlite database, survives restarts and can be
+        shared by processes. Stores the response JSON: nodes or pre-rendered
+        HTML depending on `return_html`.
+        Thread-safe, one instance can be shared by sync and async clients.
+        Lookups only read (expired responses are left to :meth:`purge` and
+        overwritten by :meth:`set`); the async client runs lookups, writes
+        and invalidations in the default executor, as queries wait for
+        each other and commits wait for the disk
+
+    :param filename: Database file
+    :param ttl: Seconds a response is cached for, None to keep it until
+                the page is edited
+    :param refresh_after: Seconds after which a cached response is
+                          refreshed in the background, None to disable
+    """
+
+    def __init__(self, filename, ttl=7 * 24 * 3600, refresh_after=3600):
+        super().__init__(ttl, refresh_after)
+        self.filename = filename
+
+        self._db = sqlite3.connect(
+            filename, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' path TEXT NOT NULL,'
+            ' return_content INTEGER NOT NULL,'
+            ' return_html INTEGER NOT NULL,'
+            ' stored_at REAL NOT NULL,'
+            ' response TEXT NOT NULL,'
+            ' PRIMARY KEY (path, return_content, return_html)'
+            ')'
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def _get_entry(self, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT stored_at, response FROM pages'
+                ' WHERE path = ? AND return_content = ? AND return_html = ?',
+                key
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return row[0], json_loads(row[1])
+
+    def _set_entry(self, key, stored_at, response):
+        response = json_dumps(response)
+
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)',
+                key + (stored_at, response)
+            )
+
+    def _expire_entry(self, key):
+        pass
+
+    def _delete_entry(self, key):
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM pages'
+                ' WHERE path = ? AND return_content = ? AND return_html = ?',
+                key
+            )
+
+    def purge(self):
+        """Delete expired responses"""
+        if self.ttl is None:
+            return
+
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM pages WHERE stored_at <= ?',
+                (time.time() - self.ttl,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM pages')
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Observers of the requests sent by :class:`telegraph.api.TelegraphApi`::
+
+    metrics = MetricsCollector()
+    telegraph = Telegraph(hooks=[metrics])
+    ...
+    print(metrics.snapshot()['createPage']['latency'])
+
+Hooks are called for every attempt (retries included) from the thread or
+event loop sending the request, so they must be fast and non-blocking.
+"""
+import bisect
+import threading
+import time
+
+from .exceptions import RetryAfterError
+
+
+# upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def payload_size(data=None, files=None):
+    """ Approximate request body size: characters of form values
+        or remaining bytes of opened files
+    """
+    size = 0
+
+    if data:
+        for key, value in data.items():
+            if value is not None:
+                size += len(key) + len(str(value)) + 2
+
+    for _, (_, f, _) in files or ():
+        if isinstance(f, bytes):
+            size += len(f)
+        elif hasattr(f, 'seekable') and f.seekable():
+            position = f.tell()
+            size += f.seek(0, 2) - position
+            f.seek(position)
+
+    return size
+
+
+class RequestEvent:
+    """ A request attempt passed to the hooks
+
+    :param method: API method name ('upload' for uploads)
+    :param url: Request URL
+    :param attempt: 0 for the first attempt, then number of the retry
+    :param bytes_sent: Approximate body size
+    """
+
+    __slots__ = (
+        'method', 'url', 'attempt', 'bytes_sent', 'started', 'elapsed',
+        'bytes_received', 'status_code'
+    )
+
+    def __init__(self, method, url, attempt, bytes_sent=0):
+        self.method = method
+        self.url = url
+        self.attempt = attempt
+        self.bytes_sent = bytes_sent
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.bytes_received = 0
+        self.status_code = None
+
+    def finish(self, http_response=None):
+        self.elapsed = time.perf_counter() - self.started
+
+        if http_response is not None:
+            self.bytes_received = len(getattr(http_response, 'content', b''))
+            self.status_code = getattr(http_response, 'status_code', None)
+
+
+class RequestHooks:
+    """Base class of hooks, methods do nothing by default"""
+
+    def before_request(self, event):
+        """Called before sending the request"""
+
+    def after_response(self, event, response):
+        """ Called with the decoded response, including responses
+            with API errors (other than FLOOD_WAIT)
+        """
+
+    def on_error(self, event, error):
+        """ Called with the exception failing the attempt, FLOOD_WAIT is
+            passed as :class:`telegraph.exceptions.RetryAfterError`
+        """
+
+
+class MethodMetrics:
+    __slots__ = (
+        'requests', 'retries', 'errors', 'latency_buckets', 'latency_sum',
+        'bytes_sent', 'bytes_received'
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = {}  # error name -> count
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def as_dict(self):
+        buckets = dict(zip(
+            [str(bound) for bound in LATENCY_BUCKETS] + ['inf'],
+            self.latency_buckets
+        ))
+
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': dict(self.errors),
+            'latency': {'buckets': buckets, 'sum': self.latency_sum},
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+        }
+
+
+class MetricsCollector(RequestHooks):
+    """ In-memory metrics per API method: number of requests and retries,
+        errors by name (API error or exception class, FLOOD_WAIT for flood
+        control), latency histogram and bytes sent and received.
+        Thread-safe, one instance can be shared by clients
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {}
+
+    def _record(self, event, error=None):
+        with self._lock:
+            metrics = self._methods.get(event.method)
+            if metrics is None:
+                metrics = self._methods[event.method] = MethodMetrics()
+
+            metrics.requests += 1
+            metrics.retries += event.attempt > 0
+            metrics.bytes_sent += event.bytes_sent
+            metrics.bytes_received += event.bytes_received
+            metrics.latency_sum += event.elapsed
+            metrics.latency_buckets[
+                bisect.bisect_left(LATENCY_BUCKETS, event.elapsed)
+            ] += 1
+
+            if error is not None:
+                metrics.errors[error] = metrics.errors.get(error, 0) + 1
+
+    def after_response(self, event, response):
+        if isinstance(response, list):
+            response = response[0] if response else {}
+
+        self._record(event, response.get('error') or None)
+
+    def on_error(self, event, error):
+        if isinstance(error, RetryAfterError):
+            name = 'FLOOD_WAIT'
+        else:
+            name = type(error).__name__
+
+        self._record(event, name)
+
+    def snapshot(self):
+        """Returns {method: metrics dict}"""
+        with self._lock:
+            return {
+                method: metrics.as_dict()
+                for method, metrics in self._methods.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+JSON encoding and decoding of requests and responses.
+
+orjson or ujson is used when installed, falling back to the standard
+library. Encoded output is the same for every backend: compact separators
+and non-ASCII characters left unescaped. Values a fast backend can't encode
+(integers over 64 bits, lone surrogates, non-str keys, unknown types) are
+encoded by the standard library instead. Floats are the exception: fast
+backends format exponents and NaN differently, node trees and API
+arguments don't contain them::
+
+    from telegraph.jsonlib import set_json_backend
+    set_json_backend('json')  # always use the standard library
+"""
+import functools
+import json
+from collections import namedtuple
+from collections.abc import Mapping
+
+
+JsonBackend = namedtuple('JsonBackend', ('name', 'dumps', 'loads'))
+
+
+def json_default(obj):
+    """Encode mappings (e.g. :class:`telegraph.nodes.Node`) as objects"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+
+    raise TypeError(
+        'Object of type {} is not JSON serializable'.format(
+            type(obj).__name__
+        )
+    )
+
+
+_stdlib_dumps = functools.partial(
+    json.dumps, separators=(',', ':'), ensure_ascii=False,
+    default=json_default
+)
+
+STDLIB_BACKEND = JsonBackend('json', _stdlib_dumps, json.loads)
+
+BACKENDS_PREFERENCE = ('orjson', 'ujson', 'json')
+
+_backend = None
+
+
+def _load_orjson():
+    import orjson
+
+    dumps = orjson.dumps
+
+    def orjson_dumps(obj):
+        return dumps(obj, default=json_default).decode('utf-8')
+
+    return JsonBackend('orjson', orjson_dumps, orjson.loads)
+
+
+def _load_ujson():
+    import ujson
+
+    return JsonBackend(
+        'ujson',
+        functools.partial(
+            ujson.dumps, ensure_ascii=False, escape_forward_slashes=False,
+            default=json_default
+        ),
+        ujson.loads
+    )
+
+
+BACKEND_LOADERS = {
+    'orjson': _load_orjson,
+    'ujson': _load_ujson,
+    'json': lambda: STDLIB_BACKEND,
+}
+
+
+def set_json_backend(name=None):
+    """ Select JSON backend used by all clients
+
+    :param name: 'orjson', 'ujson', 'json' (standard library)
+                 or None to pick the fastest installed one
+    """
+    global _backend
+
+    if name is None:
+        for name in BACKENDS_PREFERENCE:
+            try:
+                _backend = BACKEND_LOADERS[name]()
+            except ImportError:
+                continue
+
+            return
+
+    if name not in BACKEND_LOADERS:
+        raise ValueError('Unknown JSON backend: {!r}'.format(name))
+
+    _backend = BACKEND_LOADERS[name]()
+
+
+def get_json_backend():
+    """Returns JsonBackend in use"""
+    if _backend is None:
+        set_json_backend()
+
+    return _backend
+
+
+def json_dumps(obj, *args, **kwargs):
+    """ Encode `obj` to compact JSON with non-ASCII characters unescaped.
+        Extra arguments are passed to `json.dumps`
+    """
+    backend = _backend or get_json_backend()
+
+    if args or kwargs or backend is STDLIB_BACKEND:
+        return _stdlib_dumps(obj, *args, **kwargs)
+
+    try:
+        return backend.dumps(obj)
+    except (TypeError, ValueError, OverflowError):
+        return _stdlib_dumps(obj)
+
+
+def json_loads(s):
+    """Decode JSON str or bytes"""
+    backend = _backend or get_json_backend()
+
+    try:
+        return backend.loads(s)
+    except ValueError:
+        if backend is STDLIB_BACKEND:
+            raise
+
+        return json.loads(s)
+
+
+def load_response(response):
+    """ Decode JSON response body. Responses without `content`
+        (see :mod:`telegraph.testing`) are decoded by their `json` method
+    """
+    backend = _backend or get_json_backend()
+    content = getattr(response, 'content', None)
+
+    if backend is STDLIB_BACKEND or not isinstance(content, bytes):
+        return response.json()
+
+    try:
+        return backend.loads(content)
+    except ValueError:
+        # let the response raise its usual error (or handle the encoding)
+        return response.json()
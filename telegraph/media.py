@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Local media in node trees: images and videos with `src` pointing to a file
+or a data URI, which have to be uploaded before publishing
+(see `upload_media` of :meth:`telegraph.api.Telegraph.create_page`)
+"""
+import base64
+import io
+import os
+from urllib.parse import unquote_to_bytes, urlsplit
+from urllib.request import url2pathname
+
+from .nodes import map_nodes
+
+
+MEDIA_TAGS = {'img', 'video'}
+
+
+def iter_media_srcs(nodes):
+    """Yields `src` of every image and video"""
+    stack = [nodes]
+
+    while stack:
+        for node in stack.pop():
+            if isinstance(node, str):
+                continue
+
+            if node['tag'] in MEDIA_TAGS:
+                src = (node.get('attrs') or {}).get('src')
+                if src:
+                    yield src
+
+            if node.get('children'):
+                stack.append(node['children'])
+
+
+def media_file(src, root=None):
+    """ File to upload for a local `src`: filename for paths and file://
+        URLs, (file, filename, mimetype) for data URIs, None for remote
+        sources and missing files.
+
+        Any existing file the process can read is returned, absolute paths
+        included: with untrusted HTML, files of the host would be uploaded
+        and published
+
+    :param src: `src` attribute value
+    :param root: Directory relative paths are resolved against,
+                 the working directory by default
+    """
+    if src.startswith('data:'):
+        header, _, data = src[5:].partition(',')
+        params = header.split(';')
+
+        if params[-1] == 'base64':
+            content = base64.b64decode(data)
+        else:
+            content = unquote_to_bytes(data)
+
+        return io.BytesIO(content), 'file', params[0] or None
+
+    url = urlsplit(src)
+
+    if url.scheme == 'file':
+        path = url2pathname(url.path)
+    elif (not url.scheme and not url.netloc) or os.path.isabs(src):
+        path = src
+    else:
+        return None
+
+    if root is not None:
+        path = os.path.join(root, path)
+
+    return path if os.path.isfile(path) else None
+
+
+def replace_media_srcs(nodes, srcs):
+    """ Returns new node tree (dict format) with `src` of images and videos
+        replaced according to `srcs` dict
+    """
+    def make(node, children):
+        result = {'tag': node['tag']}
+        attrs = node.get('attrs')
+
+        if attrs:
+            attrs = dict(attrs)
+
+            if node['tag'] in MEDIA_TAGS and attrs.get('src') in srcs:
+                attrs['src'] = srcs[attrs['src']]
+
+            result['attrs'] = attrs
+
+        if children:
+            result['children'] = children
+
+        return result
+
+    return map_nodes(nodes, make)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Compact representation of node trees.
+
+:class:`Node` stores a tag in slots instead of a dict, children in a tuple
+and shares tag names: the tree structure takes about a fifth of the memory
+of the dict format, text is kept as is. Nodes are read-only mappings with
+the same keys as the dicts, so they can be passed to :func:`telegraph.utils.nodes_to_html` and as
+`content` of :meth:`telegraph.api.Telegraph.create_page`::
+
+    nodes = from_dicts(telegraph.get_page(path)['content'])
+    assert to_dicts(nodes) == telegraph.get_page(path)['content']
+"""
+import sys
+from collections.abc import Mapping
+
+
+class Node(Mapping):
+    """ Element of a node tree
+
+    :param tag: Tag name
+    :param attrs: Attributes dict, None if empty
+    :param children: Tuple of Node and str, None if empty
+    """
+
+    __slots__ = ('tag', 'attrs', 'children')
+
+    def __init__(self, tag, attrs=None, children=None):
+        self.tag = sys.intern(tag)
+        self.attrs = attrs or None
+        self.children = tuple(children) if children else None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+
+        if value is None:
+            raise KeyError(key)
+
+        return value
+
+    def get(self, key, default=None):
+        if key == 'tag':
+            return self.tag
+
+        if key == 'children':
+            value = self.children
+        elif key == 'attrs':
+            value = self.attrs
+        else:
+            return default
+
+        return default if value is None else value
+
+    def __iter__(self):
+        yield 'tag'
+
+        if self.attrs is not None:
+            yield 'attrs'
+
+        if self.children is not None:
+            yield 'children'
+
+    def __len__(self):
+        return 1 + (self.attrs is not None) + (self.children is not None)
+
+    def __eq__(self, other):
+        if isinstance(other, Node):
+            return (
+                self.tag == other.tag
+                and self.attrs == other.attrs
+                and self.children == other.children
+            )
+
+        if isinstance(other, Mapping):
+            return to_dicts([self]) == [other]
+
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        args = [repr(self.tag)]
+
+        if self.attrs is not None:
+            args.append('attrs={!r}'.format(self.attrs))
+
+        if self.children is not None:
+            args.append('children={!r}'.format(self.children))
+
+        return 'Node({})'.format(', '.join(args))
+
+    def __reduce__(self):
+        return Node, (self.tag, self.attrs, self.children)
+
+
+def from_dicts(nodes):
+    """ Convert nodes in dict format (from :func:`telegraph.utils.html_to_nodes`
+        or the API) to a list of :class:`Node` and str
+    """
+    return map_nodes(nodes, _make_node)
+
+
+def to_dicts(nodes):
+    """Convert :class:`Node` tree back to the dict format"""
+    return map_nodes(nodes, _make_dict)
+
+
+def _make_node(node, children):
+    return Node(node['tag'], node.get('attrs'), children)
+
+
+def _make_dict(node, children):
+    result = {'tag': node['tag']}
+
+    attrs = node.get('attrs')
+    if attrs:
+        result['attrs'] = dict(attrs)
+
+    if children:
+        result['children'] = children
+
+    return result
+
+
+def map_nodes(nodes, make):
+    """ Rebuild node tree bottom-up, elements are replaced with
+        `make(node, children)` where children are already rebuilt
+        (None if empty), strings are kept
+    """
+    out = []
+
+    stack = []
+    curr = nodes
+    i = -1
+
+    while True:
+        i += 1
+
+        if i >= len(curr):
+            if not stack:
+                break
+
+            children = out
+            curr, i, out = stack.pop()
+            out.append(make(curr[i], children))
+            continue
+
+        node = curr[i]
+
+        if isinstance(node, str):
+            out.append(node)
+            continue
+
+        if node.get('children'):
+            stack.append((curr, i, out))
+            curr, i, out = node['children'], -1, []
+            continue
+
+        out.append(make(node, None))
+
+    return out
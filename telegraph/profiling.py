@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Time spent in each stage of the calls made inside a :func:`profile` block::
+
+    with profile() as p:
+        telegraph.create_page('Title', html_content=html)
+
+    print(p.timings)
+    # {'conversion': 0.0021, 'serialization': 0.0003, 'network': 0.1843,
+    #  'deserialization': 0.0001}
+
+Stages: `conversion` (html_to_nodes), `serialization` (json_dumps of the
+content), `network` (HTTP round trip), `deserialization` (decoding the
+response JSON) and `response_conversion` (nodes_to_html in get_page).
+
+The profile is stored in a context variable, so it follows asyncio tasks
+and :func:`telegraph.batch.bounded_map` threads started inside the block.
+Concurrent calls add up, so timings may exceed the wall time. Outside of
+a block the cost is a context variable lookup per stage.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+
+_current_profile = contextvars.ContextVar('telegraph_profile', default=None)
+
+
+class Profile:
+    """Total seconds and number of calls per stage"""
+
+    __slots__ = ('timings', 'counts', '_lock')
+
+    def __init__(self):
+        self.timings = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def report(self):
+        """Returns timings as a table, the slowest stage first"""
+        total = sum(self.timings.values()) or 1.0
+
+        return '\n'.join(
+            '{:<20} {:>6} {:>10.2f}ms {:>6.1%}'.format(
+                stage, self.counts[stage], seconds * 1000, seconds / total
+            )
+            for stage, seconds in sorted(
+                self.timings.items(), key=lambda item: -item[1]
+            )
+        )
+
+
+class _Timer:
+    __slots__ = ('profile', 'stage', 'started')
+
+    def __init__(self, profile, stage):
+        self.profile = profile
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.add(self.stage, time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+@contextmanager
+def profile():
+    """Profile calls made inside the block, yields :class:`Profile`"""
+    p = Profile()
+    token = _current_profile.set(p)
+
+    try:
+        yield p
+    finally:
+        _current_profile.reset(token)
+
+
+def timed(stage):
+    """Context manager adding the time of the block to the current profile"""
+    p = _current_profile.get()
+
+    if p is None:
+        return _NULL_TIMER
+
+    return _Timer(p, stage)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+
+class TokenBucket:
+    """ Token bucket, tokens may go negative to queue up reservations
+
+    :param rate: tokens added per second
+    :param capacity: maximum number of tokens
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Take a token, returns seconds to wait before using it"""
+        now = time.monotonic()
+
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+
+        if self.tokens >= 0:
+            return 0
+
+        return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """ Client-side rate limiter with a token bucket per access token.
+        Thread-safe, one instance can be shared by sync and async clients.
+
+        The rate is multiplied by `decrease` every time FLOOD_WAIT is
+        received and then grows back by `recovery` * `rate` with every
+        successful request, so it settles just under the flood threshold.
+
+    :param rate: Maximum requests per second per access token
+    :param burst: Maximum number of requests sent at once
+    :param min_rate: Lower bound for the adapted rate
+    :param decrease: Rate multiplier on FLOOD_WAIT
+    :param recovery: Rate increase on success (fraction of `rate`)
+    """
+
+    __slots__ = (
+        'rate', 'burst', 'min_rate', 'decrease', 'recovery', '_lock',
+        '_buckets'
+    )
+
+    def __init__(self, rate=1.0, burst=5, min_rate=0.05, decrease=0.5,
+                 recovery=0.01):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.recovery = recovery
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def _get_bucket(self, key):
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+
+        return bucket
+
+    def reserve(self, key):
+        """ Reserve a request for `key`, returns seconds to wait before
+            sending it
+        """
+        with self._lock:
+            return self._get_bucket(key).reserve()
+
+    def current_rate(self, key):
+        """Adapted rate for `key`"""
+        with self._lock:
+            return self._get_bucket(key).rate
+
+    def on_success(self, key):
+        with self._lock:
+            bucket = self._get_bucket(key)
+            bucket.rate = min(self.rate, bucket.rate + self.rate * self.recovery)
+
+    def on_flood_wait(self, key):
+        with self._lock:
+            bucket = self._get_bucket(key)
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+
+
+class RetryPolicy:
+    """ Automatic retry policy for :class:`telegraph.api.TelegraphApi`
+
+    FLOOD_WAIT errors are waited out (plus a random jitter, so throttled
+    callers don't wake up together) and the wait is shared by every client
+    using the same access token. Transport errors are retried with jittered
+    exponential backoff. Note that a request failed by a transport error may
+    already have been processed by the server.
+
+    :param max_retries: Maximum number of retries per request
+    :param max_retry_after: Longest FLOOD_WAIT (in seconds) to wait out,
+                            longer ones are raised as RetryAfterError
+    :param flood_jitter: Maximum random delay (in seconds) added to FLOOD_WAIT
+    :param backoff_base: Initial delay (in seconds) after a transport error
+    :param backoff_max: Maximum delay (in seconds) after a transport error
+    """
+
+    __slots__ = (
+        'max_retries', 'max_retry_after', 'flood_jitter', 'backoff_base',
+        'backoff_max'
+    )
+
+    def __init__(self, max_retries=3, max_retry_after=60, flood_jitter=1.0,
+                 backoff_base=0.5, backoff_max=30.0):
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.flood_jitter = flood_jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff(self, attempt):
+        """ Delay before retrying after a transport error ("full jitter")
+
+        :param attempt: Number of the failed attempt, starting from 0
+        """
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        )
+
+    def flood_delay(self, delay):
+        """ Delay before sending a request to a token under flood control
+
+        :param delay: Seconds left until the flood control deadline
+        """
+        if delay <= 0:
+            return 0
+
+        return delay + random.uniform(0, self.flood_jitter)
+
+
+class FloodDeadlines:
+    """ Thread-safe registry of "do not send before" deadlines
+        keyed by (domain, access_token)
+    """
+
+    __slots__ = ('_lock', '_deadlines')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deadlines = {}
+
+    def remaining(self, key):
+        """Seconds left until the deadline for `key` (0 if there is none)"""
+        deadline = self._deadlines.get(key)
+
+        if deadline is None:
+            return 0
+
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+            with self._lock:
+                if self._deadlines.get(key) == deadline:
+                    del self._deadlines[key]
+            return 0
+
+        return remaining
+
+    def defer(self, key, seconds):
+        """Don't send requests for `key` during the next `seconds`"""
+        deadline = time.monotonic() + seconds
+
+        with self._lock:
+            if deadline > self._deadlines.get(key, 0):
+                self._deadlines[key] = deadline
+
+
+flood_deadlines = FloodDeadlines()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+
+def create_session(pool_connections=10, pool_maxsize=10, pool_block=False,
+                   max_retries=0, timeout=None):
+    """ Create `requests.Session` for :class:`telegraph.api.TelegraphApi`.
+        Connections are kept alive and reused by the pool
+
+    :param pool_connections: Number of hosts to keep connection pools for
+    :param pool_maxsize: Maximum number of connections kept per host,
+                         should be at least the number of threads
+                         sending requests
+    :param pool_block: Wait for a free connection instead of opening
+                       a connection that won't be kept in the pool
+    :param max_retries: urllib3 retries for failed connections
+    :param timeout: Default timeout in seconds (float or (connect, read))
+    """
+    import requests
+    from .adapters import TimeoutHTTPAdapter
+
+    session = requests.Session()
+
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=max_retries
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def create_async_session(max_connections=100, max_keepalive_connections=20,
+                         keepalive_expiry=5.0, http2=False, timeout=5.0,
+                         **kwargs):
+    """ Create `httpx.AsyncClient` for :class:`telegraph.aio.TelegraphApi`
+
+    :param max_connections: Maximum number of connections in the pool
+    :param max_keepalive_connections: Maximum number of idle connections
+                                      kept alive
+    :param keepalive_expiry: Seconds an idle connection is kept alive
+    :param http2: Enable HTTP/2, requests are multiplexed over a single
+                  connection (requires `telegraph[http2]`)
+    :param timeout: Timeout in seconds (float or `httpx.Timeout`)
+    :param kwargs: Other `httpx.AsyncClient` arguments
+    """
+    import httpx
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        ),
+        http2=http2,
+        timeout=timeout,
+        **kwargs
+    )
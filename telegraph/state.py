@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Last known state of edited pages, lets :meth:`telegraph.api.Telegraph.edit_page`
+skip requests that wouldn't change anything::
+
+    telegraph = Telegraph(token, state_store=JsonFileStateStore('pages.json'))
+    telegraph.edit_page(path, title, html_content=html)  # sent
+    telegraph.edit_page(path, title, html_content=html)  # skipped
+
+Pages changed by other means (another client, the web editor) aren't
+noticed, remove them with `delete` to send the next edit.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from .jsonlib import json_dumps
+
+
+def page_hash(title, content_json, author_name=None, author_url=None,
+              media=None):
+    """ Hash of page fields as sent to the API
+
+    :param content_json: Serialized content (:func:`json_dumps` output)
+    :param media: {src: content hash} of local media uploaded on publishing
+    """
+    fields = [title, author_name, author_url, content_json]
+
+    if media:
+        fields.append(sorted(media.items()))
+
+    data = json_dumps(fields)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class MemoryStateStore:
+    """In-memory store, thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages = {}  # path -> (hash, result)
+
+    def get(self, path):
+        """Returns (hash, result) of the last edit, None if unknown"""
+        with self._lock:
+            return self._pages.get(path)
+
+    def set(self, path, page_hash, result):
+        with self._lock:
+            self._pages[path] = (page_hash, result)
+
+    def delete(self, path):
+        with self._lock:
+            self._pages.pop(path, None)
+
+
+class JsonFileStateStore(MemoryStateStore):
+    """ Store persisted to a file of JSON lines: every change appends a line,
+        so a write costs the size of one page result. The file is rewritten
+        atomically without the replaced lines once they outnumber the pages
+        (the rewrite is proportional to the number of pages, and happens
+        once per that many changes)
+
+    :param filename: File name, created if it doesn't exist
+    :param compact_min_lines: Replaced lines kept before rewriting
+                              the file at least
+    """
+
+    def __init__(self, filename, compact_min_lines=1000):
+        super().__init__()
+        self.filename = filename
+        self.compact_min_lines = compact_min_lines
+        self._lines = 0
+
+        if os.path.exists(filename):
+            self._load()
+
+    def _load(self):
+        with open(self.filename, encoding='utf-8') as f:
+            data = f.read()
+
+        # split on '\n' only, titles and content may contain other line
+        # breaks. The last item is empty unless a write was interrupted
+        lines = data.split('\n')
+        partial = lines.pop()
+
+        for line in lines:
+            self._apply(*json.loads(line))
+
+        if partial:
+            try:
+                self._apply(*json.loads(partial))
+            except ValueError:
+                pass
+
+            # rewritten so that appends don't follow a partial line
+            self._compact()
+
+    def _apply(self, path, state):
+        if state is None:
+            self._pages.pop(path, None)
+        else:
+            self._pages[path] = tuple(state)
+
+        self._lines += 1
+
+    def set(self, path, page_hash, result):
+        with self._lock:
+            self._pages[path] = (page_hash, result)
+            self._append(path, (page_hash, result))
+
+    def delete(self, path):
+        with self._lock:
+            if self._pages.pop(path, None) is not None:
+                self._append(path, None)
+
+    def _append(self, path, state):
+        line = json_dumps([path, state]) + '\n'
+
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+        self._lines += 1
+
+        if self._lines - len(self._pages) > max(
+            self.compact_min_lines, len(self._pages)
+        ):
+            self._compact()
+
+    def _compact(self):
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_filename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for path, state in self._pages.items():
+                    f.write(json_dumps([path, state]) + '\n')
+
+            os.replace(tmp_filename, self.filename)
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
+
+        self._lines = len(self._pages)
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+In-process stand-in for the Telegraph API, for tests and benchmarks.
+
+Any object with `post(url, data=None, files=None)` returning a response with
+`.json()` can be passed as `session` to :class:`telegraph.api.TelegraphApi`
+(a coroutine `post(url, data=None, content=None, headers=None)` for
+:class:`telegraph.aio.TelegraphApi`, files are sent as a streamed
+multipart `content`)::
+
+    server = FakeTelegraphServer(latency=0.05)
+    telegraph = Telegraph(session=server.session())
+
+    server.inject_flood_wait(3)  # next request fails with FLOOD_WAIT_3
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+RE_NOT_SLUG = re.compile(r'[^\w]+', re.UNICODE)
+RE_PART_HEADER = re.compile(r'([\w-]+): ([^\r\n]*)')
+RE_DISPOSITION_PARAM = re.compile(r'(\w+)="([^"]*)"')
+
+ACCOUNT_FIELDS = ('short_name', 'author_name', 'author_url')
+
+MAX_CONTENT_SIZE = 64 * 1024
+
+
+class FakeTelegraphError(Exception):
+    pass
+
+
+class FakeResponse:
+    __slots__ = ('content', 'status_code')
+
+    def __init__(self, data):
+        self.content = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.status_code = 200
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def parse_multipart(body, content_type):
+    """Returns files of multipart/form-data body in `requests` format"""
+    boundary = content_type.split('boundary=', 1)[1].encode('ascii')
+    files = []
+
+    for part in body.split(b'--' + boundary)[1:-1]:
+        head, _, content = part[2:-2].partition(b'\r\n\r\n')
+        headers = dict(RE_PART_HEADER.findall(head.decode('utf-8')))
+        params = dict(RE_DISPOSITION_PARAM.findall(
+            headers['Content-Disposition']
+        ))
+
+        files.append((
+            params['name'],
+            (params.get('filename'), content, headers.get('Content-Type'))
+        ))
+
+    return files
+
+
+class FakeSession:
+    """`requests.Session` replacement sending requests to the fake server"""
+
+    def __init__(self, server):
+        self.server = server
+
+    def post(self, url, data=None, files=None, **kwargs):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        return FakeResponse(self.server.handle(url, data, files))
+
+    def close(self):
+        pass
+
+
+class AsyncFakeSession:
+    """`httpx.AsyncClient` replacement sending requests to the fake server"""
+
+    def __init__(self, server):
+        self.server = server
+
+    async def post(self, url, data=None, files=None, content=None,
+                   headers=None, **kwargs):
+        if self.server.latency:
+            await asyncio.sleep(self.server.latency)
+
+        if content is not None:
+            body = b''.join([chunk async for chunk in content])
+
+            if len(body) != int(headers.get('Content-Length', len(body))):
+                raise ValueError('Body size differs from Content-Length')
+
+            files = parse_multipart(body, headers['Content-Type'])
+
+        return FakeResponse(self.server.handle(url, data, files))
+
+    async def aclose(self):
+        pass
+
+
+class FakeTelegraphServer:
+    """ In-memory implementation of the Telegraph API and upload endpoint.
+        Thread-safe, can be shared by sync and async sessions
+
+    :param latency: Seconds each request takes
+    :param max_content_size: Maximum size of page content in bytes,
+                             None to disable the limit
+    """
+
+    def __init__(self, latency=0, max_content_size=MAX_CONTENT_SIZE):
+        self.latency = latency
+        self.max_content_size = max_content_size
+
+        self.accounts = {}  # access_token -> account
+        self.pages = {}  # path -> page
+        self.views = {}  # (path, year, month, day, hour) -> views
+        self.files = {}  # src -> content
+
+        self.requests = []  # (method, path, data) of handled requests
+
+        self._lock = threading.Lock()
+        self._flood_waits = []  # [seconds, count, method]
+        self._counter = 0
+
+    def session(self):
+        return FakeSession(self)
+
+    def async_session(self):
+        return AsyncFakeSession(self)
+
+    def inject_flood_wait(self, seconds, count=1, method=None):
+        """ Fail the next `count` requests (to `method` only if passed)
+            with FLOOD_WAIT_`seconds`
+        """
+        with self._lock:
+            self._flood_waits.append([seconds, count, method])
+
+    def requests_for(self, method):
+        """Recorded (method, path, data) requests to `method`"""
+        with self._lock:
+            return [r for r in self.requests if r[0] == method]
+
+    def set_views(self, path, views, year=None, month=None, day=None,
+                  hour=None):
+        """Set views returned by getViews for the given period"""
+        with self._lock:
+            self.views[(path, year, month, day, hour)] = views
+
+    def handle(self, url, data=None, files=None):
+        """Handle a request, returns decoded response"""
+        url = urlsplit(url)
+
+        if url.hostname.startswith('api.'):
+            method, _, path = url.path.lstrip('/').partition('/')
+        else:
+            method, path = url.path.lstrip('/'), ''
+
+        data = {k: v for k, v in (data or {}).items() if v is not None}
+
+        with self._lock:
+            self.requests.append((method, path, data))
+
+            error = self._pop_flood_wait(method)
+            if error is None:
+                try:
+                    if method == 'upload':
+                        return self._upload(files)
+
+                    handler = getattr(self, '_' + method, None)
+                    if handler is None:
+                        raise FakeTelegraphError('UNKNOWN_METHOD')
+
+                    return {'ok': True, 'result': handler(path, data)}
+                except FakeTelegraphError as e:
+                    error = str(e)
+
+        if method == 'upload':
+            return {'error': error}
+
+        return {'ok': False, 'error': error}
+
+    def _pop_flood_wait(self, method):
+        for flood_wait in self._flood_waits:
+            seconds, count, flood_method = flood_wait
+
+            if flood_method is None or flood_method == method:
+                if count <= 1:
+                    self._flood_waits.remove(flood_wait)
+                else:
+                    flood_wait[1] -= 1
+
+                return 'FLOOD_WAIT_{}'.format(seconds)
+
+    def _next_id(self):
+        self._counter += 1
+        return self._counter
+
+    def _get_account(self, data):
+        account = self.accounts.get(data.get('access_token'))
+
+        if account is None:
+            raise FakeTelegraphError('ACCESS_TOKEN_INVALID')
+
+        return account
+
+    @staticmethod
+    def _account_result(account, fields=ACCOUNT_FIELDS):
+        return {k: account[k] for k in fields if k in account}
+
+    def _createAccount(self, path, data):
+        if not data.get('short_name'):
+            raise FakeTelegraphError('SHORT_NAME_REQUIRED')
+
+        account = {k: data.get(k, '') for k in ACCOUNT_FIELDS}
+        account['access_token'] = 'token{}'.format(self._next_id())
+        account['auth_url'] = 'https://edit.telegra.ph/auth/{}'.format(
+            account['access_token']
+        )
+        self.accounts[account['access_token']] = account
+
+        return dict(account)
+
+    def _editAccountInfo(self, path, data):
+        account = self._get_account(data)
+        account.update({k: data[k] for k in ACCOUNT_FIELDS if k in data})
+
+        return self._account_result(account)
+
+    def _getAccountInfo(self, path, data):
+        account = self._get_account(data)
+
+        fields = ACCOUNT_FIELDS
+        if data.get('fields'):
+            fields = json.loads(data['fields'])
+
+        result = self._account_result(account, fields)
+        if 'page_count' in fields:
+            result['page_count'] = sum(
+                1 for page in self.pages.values()
+                if page['access_token'] == account['access_token']
+            )
+
+        return result
+
+    def _revokeAccessToken(self, path, data):
+        account = self.accounts.pop(self._get_account(data)['access_token'])
+        old_access_token = account['access_token']
+
+        account['access_token'] = 'token{}'.format(self._next_id())
+        self.accounts[account['access_token']] = account
+
+        for page in self.pages.values():
+            if page['access_token'] == old_access_token:
+                page['access_token'] = account['access_token']
+
+        return self._account_result(account, ('access_token', 'auth_url'))
+
+    @staticmethod
+    def _page_result(page, return_content):
+        result = {
+            k: v for k, v in page.items()
+            if k not in ('access_token', 'content', 'created')
+        }
+
+        if return_content:
+            result['content'] = page['content']
+
+        return result
+
+    def _parse_page(self, data):
+        if not data.get('title'):
+            raise FakeTelegraphError('TITLE_REQUIRED')
+
+        content = data.get('content')
+        if not content:
+            raise FakeTelegraphError('CONTENT_REQUIRED')
+
+        if (self.max_content_size is not None
+                and len(content.encode('utf-8')) > self.max_content_size):
+            raise FakeTelegraphError('CONTENT_TOO_BIG')
+
+        try:
+            content = json.loads(content)
+        except ValueError:
+            raise FakeTelegraphError('CONTENT_INVALID')
+
+        return {
+            'title': data['title'],
+            'description': '',
+            'author_name': data.get('author_name', ''),
+            'author_url': data.get('author_url', ''),
+            'content': content,
+        }
+
+    def _createPage(self, path, data):
+        account = self._get_account(data)
+        page = self._parse_page(data)
+
+        page_id = self._next_id()
+        path = '{}-{}'.format(RE_NOT_SLUG.sub('-', page['title']), page_id)
+
+        page.update({
+            'path': path,
+            'url': 'https://telegra.ph/{}'.format(path),
+            'views': 0,
+            'can_edit': True,
+            'access_token': account['access_token'],
+            'created': page_id,
+        })
+        self.pages[path] = page
+
+        return self._page_result(page, data.get('return_content'))
+
+    def _editPage(self, path, data):
+        account = self._get_account(data)
+        page = self.pages.get(path)
+
+        if page is None:
+            raise FakeTelegraphError('PAGE_NOT_FOUND')
+
+        if page['access_token'] != account['access_token']:
+            raise FakeTelegraphError('PAGE_ACCESS_DENIED')
+
+        page.update(self._parse_page(data))
+
+        return self._page_result(page, data.get('return_content'))
+
+    def _getPage(self, path, data):
+        page = self.pages.get(path)
+
+        if page is None:
+            raise FakeTelegraphError('PAGE_NOT_FOUND')
+
+        page['views'] += 1
+
+        result = self._page_result(page, data.get('return_content'))
+        result.pop('can_edit')
+
+        return result
+
+    def _getPageList(self, path, data):
+        account = self._get_account(data)
+
+        offset = int(data.get('offset', 0))
+        limit = int(data.get('limit', 50))
+
+        pages = sorted(
+            (
+                page for page in self.pages.values()
+                if page['access_token'] == account['access_token']
+            ),
+            key=lambda page: page['created'],
+            reverse=True
+        )
+
+        return {
+            'total_count': len(pages),
+            'pages': [
+                self._page_result(page, False)
+                for page in pages[offset:offset + limit]
+            ]
+        }
+
+    def _getViews(self, path, data):
+        page = self.pages.get(path)
+
+        if page is None:
+            raise FakeTelegraphError('PAGE_NOT_FOUND')
+
+        key = (path,) + tuple(
+            data.get(k) for k in ('year', 'month', 'day', 'hour')
+        )
+
+        if key in self.views:
+            return {'views': self.views[key]}
+
+        if key[1:] == (None, None, None, None):
+            return {'views': page['views']}
+
+        return {'views': 0}
+
+    def _upload(self, files):
+        result = []
+
+        for _, (_, f, mimetype) in files:
+            content = f.read() if hasattr(f, 'read') else f
+
+            if mimetype not in ('image/jpeg', 'image/png', 'image/gif',
+                                'video/mp4'):
+                raise FakeTelegraphError('File type invalid')
+
+            src = '/file/{}.{}'.format(
+                hashlib.sha1(content).hexdigest()[:20],
+                mimetype.split('/')[1].replace('jpeg', 'jpg')
+            )
+            self.files[src] = content
+            result.append({'src': src})
+
+        return result
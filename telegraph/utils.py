@@ -1,15 +1,33 @@
 # -*- coding: utf-8 -*-
-import mimetypes
+import functools
+import os
 import re
-import json
 from html.parser import HTMLParser
 from html.entities import name2codepoint
-from html import escape
+from html import escape, unescape
+from string import ascii_letters
 
 from .exceptions import NotAllowedTag, InvalidHTML
 
 
-RE_WHITESPACE = re.compile(r'(\s+)', re.UNICODE)
+# characters after '<' HTMLParser doesn't treat as text
+STARTTAG_CHARS = set(ascii_letters + '/!?')
+
+# Well-formed tags only, anything else is left to HTMLParser.
+# Whitespace is limited to what HTMLParser treats as such in every context
+RE_START_TAG = re.compile(
+    r'<([a-zA-Z][a-zA-Z0-9]*)'
+    r'((?:[\t\n\r\f ]+[a-zA-Z_:][-a-zA-Z0-9_:.]*'
+    r'(?:[\t\n\r\f ]*=[\t\n\r\f ]*'
+    r'(?:"[^"]*"|\'[^\']*\'|[^\s"\'=<>`/]+(?=[\t\n\r\f >])))?)*)'
+    r'[\t\n\r\f ]*(/?)>'
+)
+RE_ATTR = re.compile(
+    r'([a-zA-Z_:][-a-zA-Z0-9_:.]*)'
+    r'(?:[\t\n\r\f ]*=[\t\n\r\f ]*'
+    r'(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`/]+)))?'
+)
+RE_END_TAG = re.compile(r'</([a-zA-Z][a-zA-Z0-9]*)[\t\n\r\f ]*>')
 
 
 ALLOWED_TAGS = {
@@ -32,6 +50,28 @@ BLOCK_ELEMENTS = {
 }
 
 
+def collapse_whitespace(s):
+    """Replace whitespace runs with a single space, `s` must not be empty"""
+    words = s.split()
+
+    if not words:
+        return ' '
+
+    collapsed = ' '.join(words)
+
+    if s[0].isspace():
+        collapsed = ' ' + collapsed
+
+    if s[-1].isspace():
+        collapsed += ' '
+
+    return collapsed
+
+
+class UnsupportedMarkup(Exception):
+    """Markup the fast tokenizer leaves to HTMLParser"""
+
+
 class HtmlToNodesParser(HTMLParser):
     def __init__(self):
         HTMLParser.__init__(self)
@@ -42,15 +82,17 @@ class HtmlToNodesParser(HTMLParser):
         self.parent_nodes = []
 
         self.last_text_node = None
+        self.text_parts = []  # text not yet added to current_nodes
 
         self.tags_path = []
+        self.pre_depth = 0  # number of 'pre' in tags_path
 
     def add_str_node(self, s):
         if not s:
             return
 
-        if 'pre' not in self.tags_path:  # keep whitespace in <pre>
-            s = RE_WHITESPACE.sub(' ', s)
+        if not self.pre_depth:  # keep whitespace in <pre>
+            s = collapse_whitespace(s)
 
             if self.last_text_node is None or self.last_text_node.endswith(' '):
                 s = s.lstrip(' ')
@@ -61,6 +103,12 @@ class HtmlToNodesParser(HTMLParser):
 
             self.last_text_node = s
 
+        self.text_parts.append(s)
+
+    def flush_text(self):
+        s = ''.join(self.text_parts)
+        self.text_parts = []
+
         if self.current_nodes and isinstance(self.current_nodes[-1], str):
             self.current_nodes[-1] += s
         else:
@@ -70,11 +118,16 @@ class HtmlToNodesParser(HTMLParser):
         if tag not in ALLOWED_TAGS:
             raise NotAllowedTag(f'{tag!r} tag is not allowed')
 
+        if self.text_parts:
+            self.flush_text()
+
         if tag in BLOCK_ELEMENTS:
             self.last_text_node = None
 
         node = {'tag': tag}
         self.tags_path.append(tag)
+        if tag == 'pre':
+            self.pre_depth += 1
         self.current_nodes.append(node)
 
         if attrs_list:
@@ -95,6 +148,9 @@ class HtmlToNodesParser(HTMLParser):
         if not len(self.parent_nodes):
             raise InvalidHTML(f'{tag!r} missing start tag')
 
+        if self.text_parts:
+            self.flush_text()
+
         self.current_nodes = self.parent_nodes.pop()
 
         last_node = self.current_nodes[-1]
@@ -102,7 +158,8 @@ class HtmlToNodesParser(HTMLParser):
         if last_node['tag'] != tag:
             raise InvalidHTML(f'{tag!r} tag closed instead of {last_node["tag"]!r}')
 
-        self.tags_path.pop()
+        if self.tags_path.pop() == 'pre':
+            self.pre_depth -= 1
 
         if not last_node['children']:
             last_node.pop('children')
@@ -121,7 +178,83 @@ class HtmlToNodesParser(HTMLParser):
 
         self.add_str_node(c)
 
+    def feed_fast(self, html_content):
+        """ Parse a whole document calling the same handlers as `feed`.
+            Tokenizes common well-formed markup several times faster than
+            HTMLParser, raises UnsupportedMarkup on anything else (comments,
+            declarations, malformed tags), then `feed` has to be used with
+            a new parser
+        """
+        find = html_content.find
+        match_start_tag = RE_START_TAG.match
+        match_end_tag = RE_END_TAG.match
+
+        handle_data = self.handle_data
+        handle_starttag = self.handle_starttag
+        handle_endtag = self.handle_endtag
+
+        i = 0
+        n = len(html_content)
+
+        while i < n:
+            j = find('<', i)
+
+            if j < 0:
+                text = html_content[i:]
+
+                if '&' in text:  # HTMLParser waits for the end of a charref
+                    raise UnsupportedMarkup(text)
+
+                handle_data(text)
+                break
+
+            if i < j:
+                handle_data(unescape(html_content[i:j]))
+
+            m = match_start_tag(html_content, j)
+            if m is not None:
+                tag, attrs, self_closing = m.groups()
+                tag = tag.lower()
+
+                attrs_list = []
+                if attrs:
+                    for attr in RE_ATTR.finditer(attrs):
+                        name, dquoted, squoted, value = attr.groups()
+
+                        if dquoted is not None:
+                            value = dquoted
+                        elif squoted is not None:
+                            value = squoted
+
+                        if value:
+                            value = unescape(value)
+
+                        attrs_list.append((name.lower(), value))
+
+                handle_starttag(tag, attrs_list)
+                if self_closing:
+                    handle_endtag(tag)
+
+                i = m.end()
+                continue
+
+            m = match_end_tag(html_content, j)
+            if m is not None:
+                handle_endtag(m.group(1).lower())
+                i = m.end()
+                continue
+
+            if j + 1 < n and html_content[j + 1] not in STARTTAG_CHARS:
+                handle_data('<')
+                i = j + 1
+                continue
+
+            raise UnsupportedMarkup(html_content[j:j + 10])
+
     def get_nodes(self):
+        if self.text_parts:
+            self.flush_text()
+
         if self.parent_nodes:
             not_closed_tag = self.parent_nodes[-1][-1]['tag']
             raise InvalidHTML(f'{not_closed_tag!r} tag is not closed')
@@ -131,11 +264,65 @@ class HtmlToNodesParser(HTMLParser):
 
 def html_to_nodes(html_content):
     parser = HtmlToNodesParser()
-    parser.feed(html_content)
+
+    try:
+        parser.feed_fast(html_content)
+    except UnsupportedMarkup:
+        parser = HtmlToNodesParser()
+        parser.feed(html_content)
+
+    return parser.get_nodes()
+
+
+def stream_html_to_nodes(source, encoding='utf-8', chunk_size=64 * 1024):
+    """ Convert HTML read in chunks, only the unparsed part of the input is
+        kept in memory. Raises NotAllowedTag and InvalidHTML as soon as the
+        chunk with the offending tag is fed.
+        Unlike :func:`html_to_nodes`, the end of the input is flushed, so the
+        result doesn't depend on chunk boundaries even if the last text
+        ends with an unterminated character reference like "AT&T"
+
+    :param source: File object (text or binary) or iterable of str or bytes
+    :param encoding: Encoding of bytes chunks
+    :param chunk_size: Number of bytes or characters read from a file at once
+    """
+    if hasattr(source, 'read'):
+        source = iter(functools.partial(source.read, chunk_size), source.read(0))
+    elif isinstance(source, (str, bytes)):
+        source = [source]
+
+    parser = HtmlToNodesParser()
+    decoder = None
+
+    for chunk in source:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                import codecs
+                decoder = codecs.getincrementaldecoder(encoding)()
+
+            chunk = decoder.decode(chunk)
+
+        parser.feed(chunk)
+
+    if decoder is not None:
+        parser.feed(decoder.decode(b'', final=True))
+
+    parser.close()
+
     return parser.get_nodes()
 
 
 def nodes_to_html(nodes):
+    return ''.join(iter_nodes_html(nodes, batch_size=None))
+
+
+def iter_nodes_html(nodes, batch_size=1024):
+    """ Convert nodes to HTML lazily, yields chunks of HTML made of about
+        `batch_size` tags and strings each
+
+    :param batch_size: Number of fragments joined into a chunk,
+                       None to yield a single chunk
+    """
     out = []
     append = out.append
 
@@ -144,6 +331,10 @@ def nodes_to_html(nodes):
     i = -1
 
     while True:
+        if batch_size is not None and len(out) >= batch_size:
+            yield ''.join(out)
+            out.clear()
+
         i += 1
 
         if i >= len(curr):
@@ -176,7 +367,79 @@ def nodes_to_html(nodes):
         else:
             append(f'></{node["tag"]}>')
 
-    return ''.join(out)
+    if out:
+        yield ''.join(out)
+
+
+def write_nodes_html(nodes, fileobj, encoding=None, batch_size=1024):
+    """ Write nodes as HTML to a file object chunk by chunk, without building
+        the whole document in memory
+
+    :param fileobj: Object with `write` method (file, socket file, ...)
+    :param encoding: Encode chunks before writing, for binary files
+    :param batch_size: See :func:`iter_nodes_html`
+    """
+    write = fileobj.write
+
+    for chunk in iter_nodes_html(nodes, batch_size):
+        if encoding is not None:
+            chunk = chunk.encode(encoding)
+
+        write(chunk)
+
+
+# signatures of the file types accepted by upload: (offset, bytes, mimetype)
+# major brands of MP4 files, other ISO media files (QuickTime, HEIC, M4A)
+# have an ftyp box too and are left to the filename
+MP4_BRANDS = (
+    b'isom', b'iso2', b'iso4', b'iso5', b'iso6', b'mp41', b'mp42', b'avc1',
+    b'dash'
+)
+
+MAGIC_NUMBERS = (
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+) + tuple((4, b'ftyp' + brand, 'video/mp4') for brand in MP4_BRANDS)
+
+SNIFF_SIZE = 12
+
+
+@functools.lru_cache(maxsize=None)
+def get_mimetypes_db():
+    """Shared `mimetypes.MimeTypes`, system tables are read on first use"""
+    import mimetypes
+    return mimetypes.MimeTypes()
+
+
+def sniff_mimetype(header):
+    """Detect jpeg, png, gif or mp4 by the first bytes of a file"""
+    for offset, magic, mimetype in MAGIC_NUMBERS:
+        if header[offset:offset + len(magic)] == magic:
+            return mimetype
+
+    return None
+
+
+def guess_mimetype(f, filename=''):
+    """ Guess mimetype of an opened file by its content (seekable files
+        only, read position is restored), then by the filename
+    """
+    header = None
+    if isinstance(f, bytes):
+        header = f[:SNIFF_SIZE]
+    elif hasattr(f, 'seekable') and f.seekable():
+        position = f.tell()
+        header = f.read(SNIFF_SIZE)
+        f.seek(position)
+
+    mimetype = sniff_mimetype(header) if header else None
+
+    if mimetype is None and isinstance(filename, str) and filename:
+        mimetype = get_mimetypes_db().guess_type(filename)[0]
+
+    return mimetype
 
 
 class FilesOpener(object):
@@ -187,6 +450,7 @@ class FilesOpener(object):
         self.paths = paths
         self.key_format = key_format
         self.opened_files = []
+        self.start_positions = {}
 
     def __enter__(self):
         return self.open_files()
@@ -201,12 +465,16 @@ class FilesOpener(object):
 
         for x, file_or_name in enumerate(self.paths):
             name = ''
+            mimetype = None
             if isinstance(file_or_name, tuple) and len(file_or_name) >= 2:
                 name = file_or_name[1]
+                if len(file_or_name) >= 3:
+                    mimetype = file_or_name[2]
                 file_or_name = file_or_name[0]
 
             if hasattr(file_or_name, 'read'):
                 f = file_or_name
+                self.rewind(f)
 
                 if hasattr(f, 'name'):
                     filename = f.name
@@ -217,7 +485,8 @@ class FilesOpener(object):
                 f = open(filename, 'rb')
                 self.opened_files.append(f)
 
-            mimetype = mimetypes.MimeTypes().guess_type(filename)[0]
+            if mimetype is None:
+                mimetype = guess_mimetype(f, filename)
 
             files.append(
                 (self.key_format.format(x), ('file{}'.format(x), f, mimetype))
@@ -225,6 +494,18 @@ class FilesOpener(object):
 
         return files
 
+    def rewind(self, f):
+        """ Seek file-like object back to the position it had when files were
+            opened first, so that the files can be sent again on retry
+        """
+        if not hasattr(f, 'seekable') or not f.seekable():
+            return
+
+        if id(f) in self.start_positions:
+            f.seek(self.start_positions[id(f)])
+        else:
+            self.start_positions[id(f)] = f.tell()
+
     def close_files(self):
         for f in self.opened_files:
             f.close()
@@ -232,5 +513,140 @@ class FilesOpener(object):
         self.opened_files = []
 
 
-def json_dumps(*args, **kwargs):
-    return json.dumps(*args, **kwargs, separators=(',', ':'), ensure_ascii=False)
+class AsyncFilesOpener(FilesOpener):
+    """ :class:`FilesOpener` used with `async with`, files are opened and
+        closed in the default executor so the event loop isn't blocked
+    """
+
+    async def __aenter__(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.open_files)
+
+    async def __aexit__(self, type, value, traceback):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close_files)
+
+
+def file_hash(f, chunk_size=256 * 1024):
+    """ SHA-256 hex digest of a file content. File-like objects are read
+        from the current position and seeked back, so they must be seekable
+
+    :param f: filename, file-like object or (file, filename) tuple
+    """
+    if isinstance(f, tuple):
+        f = f[0]
+
+    if not hasattr(f, 'read'):
+        with open(f, 'rb') as opened:
+            return file_hash(opened, chunk_size)
+
+    import hashlib
+    digest = hashlib.sha256()
+    position = f.tell()
+
+    for chunk in iter(functools.partial(f.read, chunk_size), f.read(0)):
+        digest.update(chunk)
+
+    f.seek(position)
+
+    return digest.hexdigest()
+
+
+async def async_file_hash(f, chunk_size=256 * 1024):
+    """:func:`file_hash` computed in the default executor"""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, file_hash, f, chunk_size)
+
+
+def multipart_kwargs(files):
+    """`session.post` arguments to send opened files"""
+    return {'files': files}
+
+
+def async_multipart_kwargs(files, chunk_size=256 * 1024):
+    """ `httpx.AsyncClient.post` arguments to send opened files as
+        a multipart body streamed from the files, read in the default
+        executor `chunk_size` bytes at a time
+    """
+    boundary = os.urandom(16).hex()
+    parts = []
+    length = 0
+
+    for name, (filename, f, mimetype) in files:
+        header = (
+            '--{}\r\nContent-Disposition: form-data; name="{}"; '
+            'filename="{}"\r\n'.format(boundary, name, filename)
+        )
+        if mimetype is not None:
+            header += 'Content-Type: {}\r\n'.format(mimetype)
+
+        header = (header + '\r\n').encode('utf-8')
+        parts.append((header, f))
+
+        size = _remaining_size(f)
+        if length is not None and size is not None:
+            length += len(header) + size + 2
+        else:
+            length = None
+
+    closing = '--{}--\r\n'.format(boundary).encode('ascii')
+
+    headers = {
+        'Content-Type': 'multipart/form-data; boundary={}'.format(boundary)
+    }
+    if length is not None:
+        headers['Content-Length'] = str(length + len(closing))
+
+    return {
+        'content': _multipart_stream(parts, closing, chunk_size),
+        'headers': headers
+    }
+
+
+def _remaining_size(f):
+    if isinstance(f, bytes):
+        return len(f)
+
+    if not hasattr(f, 'seekable') or not f.seekable():
+        return None
+
+    position = f.tell()
+    size = f.seek(0, os.SEEK_END) - position
+    f.seek(position)
+
+    return size
+
+
+async def _multipart_stream(parts, closing, chunk_size):
+    import asyncio
+    loop = asyncio.get_running_loop()
+
+    for header, f in parts:
+        yield header
+
+        if isinstance(f, bytes):
+            yield f
+        else:
+            while True:
+                chunk = await loop.run_in_executor(None, f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+        yield b'\r\n'
+
+    yield closing
+
+
+def __getattr__(name):
+    # kept for compatibility, the JSON backend is chosen on first use
+    if name == 'json_dumps':
+        from .jsonlib import json_dumps
+        return json_dumps
+
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name)
+    )
@@ -1,2 +1,16 @@
+from . import test_analytics
+from . import test_api
+from . import test_batch
+from . import test_cache
+from . import test_generate_async_api
+from . import test_hooks
 from . import test_html_converter
+from . import test_imports
+from . import test_jsonlib
+from . import test_nodes
+from . import test_profiling
+from . import test_ratelimit
+from . import test_state
 from . import test_telegraph
+from . import test_testing
+from . import test_upload
@@ -0,0 +1,154 @@
+import asyncio
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from unittest import TestCase
+
+from telegraph import Telegraph
+from telegraph.aio import Telegraph as AsyncTelegraph
+from telegraph.analytics import (
+    ViewsCache, iter_periods, period_args, period_end
+)
+from telegraph.exceptions import TelegraphException
+from telegraph.testing import FakeTelegraphServer
+
+
+class TestPeriods(TestCase):
+    def test_iter_periods(self):
+        self.assertEqual(
+            list(iter_periods(date(2023, 11, 15), date(2024, 2, 1), 'month')),
+            [datetime(2023, 11, 1), datetime(2023, 12, 1),
+             datetime(2024, 1, 1), datetime(2024, 2, 1)]
+        )
+        self.assertEqual(
+            len(list(iter_periods(
+                datetime(2024, 2, 28, 5, 30), date(2024, 3, 1), 'hour'
+            ))),
+            19 + 24 + 24
+        )
+        self.assertEqual(
+            len(list(iter_periods(
+                date(2024, 1, 1), date(2024, 1, 31), 'hour'
+            ))),
+            31 * 24
+        )
+        self.assertEqual(
+            list(iter_periods(
+                datetime(2024, 1, 1), datetime(2024, 1, 1, 1), 'hour'
+            )),
+            [datetime(2024, 1, 1), datetime(2024, 1, 1, 1)]
+        )
+
+    def test_iter_periods_aware(self):
+        start = datetime(
+            2024, 1, 1, 5, 30, tzinfo=timezone(timedelta(hours=3))
+        )
+
+        self.assertEqual(
+            list(iter_periods(start, datetime(2024, 1, 1, 3), 'hour')),
+            [datetime(2024, 1, 1, 2), datetime(2024, 1, 1, 3)]
+        )
+
+    def test_unknown_granularity(self):
+        with self.assertRaises(ValueError):
+            list(iter_periods(date(2024, 1, 1), date(2024, 1, 2), 'week'))
+
+    def test_period_args(self):
+        dt = datetime(2024, 2, 29, 23)
+
+        self.assertEqual(period_args(dt, 'year'), (2024, None, None, None))
+        self.assertEqual(period_args(dt, 'hour'), (2024, 2, 29, 23))
+
+        self.assertEqual(period_end(2024, 2, 29, 23), datetime(2024, 3, 1))
+        self.assertEqual(period_end(2024, 12), datetime(2025, 1, 1))
+        self.assertEqual(period_end(2024), datetime(2025, 1, 1))
+
+
+class TestViewsSeries(TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        self.telegraph = Telegraph(session=self.server.session())
+        self.telegraph.create_account('test')
+
+        self.paths = [
+            self.telegraph.create_page(str(i), html_content='x')['path']
+            for i in range(3)
+        ]
+
+        for i, path in enumerate(self.paths):
+            for hour in range(24):
+                self.server.set_views(path, i * 100 + hour, 2024, 1, 1, hour)
+
+    def assert_series(self, series):
+        self.assertEqual(set(series), set(self.paths))
+
+        for i, path in enumerate(self.paths):
+            self.assertEqual(
+                series[path].views,
+                array('q', [i * 100 + hour for hour in range(24)])
+            )
+            self.assertEqual(len(series[path]), 24)
+
+        self.assertIs(
+            series[self.paths[0]].starts, series[self.paths[1]].starts
+        )
+        self.assertEqual(
+            list(series[self.paths[1]])[5], (datetime(2024, 1, 1, 5), 105)
+        )
+
+    def test_series(self):
+        series = self.telegraph.get_views_series(
+            self.paths, date(2024, 1, 1), datetime(2024, 1, 1, 23),
+            concurrency=4
+        )
+
+        self.assert_series(series)
+        self.assertEqual(len(self.server.requests_for('getViews')), 3 * 24)
+        self.assertEqual(series[self.paths[2]].total(), 24 * 200 + 276)
+
+    def test_views_cache(self):
+        cache = ViewsCache()
+        telegraph = Telegraph(
+            self.telegraph.get_access_token(),
+            session=self.server.session(),
+            views_cache=cache
+        )
+        now = datetime.now(timezone.utc)
+
+        for _ in range(2):
+            self.assert_series(telegraph.get_views_series(
+                self.paths, date(2024, 1, 1), datetime(2024, 1, 1, 23)
+            ))
+            telegraph.get_views_series(self.paths, now, now)
+
+        # past hours are requested once, the current one every time
+        self.assertEqual(
+            len(self.server.requests_for('getViews')), 3 * 24 + 3 * 2
+        )
+        self.assertEqual(len(cache), 3 * 24)
+
+        self.assertEqual(
+            telegraph.get_views(self.paths[0], 2024, 1, 1, 5), {'views': 5}
+        )
+        self.assertEqual(
+            len(self.server.requests_for('getViews')), 3 * 24 + 3 * 2
+        )
+
+    def test_error(self):
+        with self.assertRaises(TelegraphException):
+            self.telegraph.get_views_series(
+                self.paths + ['missing'], date(2024, 1, 1), date(2024, 1, 1)
+            )
+
+    def test_async(self):
+        async def get_views_series():
+            telegraph = AsyncTelegraph(
+                self.telegraph.get_access_token(),
+                session=self.server.async_session(),
+                views_cache=ViewsCache()
+            )
+
+            return await telegraph.get_views_series(
+                self.paths, date(2024, 1, 1), datetime(2024, 1, 1, 23)
+            )
+
+        self.assert_series(asyncio.run(get_views_series()))
@@ -0,0 +1,229 @@
+import io
+import pickle
+from unittest import TestCase, mock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from telegraph.api import TelegraphApi
+from telegraph.exceptions import RetryAfterError, TelegraphException
+from telegraph.retry import RetryPolicy, flood_deadlines
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    """Returns (or raises) prepared responses one by one"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def post(self, url, data=None, files=None):
+        if files is not None:
+            files = [f.read() for _, (_, f, _) in files]
+
+        self.requests.append((url, data, files))
+        response = self.responses.pop(0)
+
+        if isinstance(response, Exception):
+            raise response
+
+        return StubResponse(response)
+
+
+def make_api(session, retry=None, access_token='token'):
+    api = TelegraphApi(access_token, retry=retry)
+    api.session = session
+    return api
+
+
+@mock.patch('telegraph.api.time.sleep')
+class TestRetry(TestCase):
+    def tearDown(self):
+        flood_deadlines._deadlines.clear()
+
+    def test_no_retry_by_default(self, sleep):
+        api = make_api(StubSession({'ok': False, 'error': 'FLOOD_WAIT_3'}))
+
+        with self.assertRaises(RetryAfterError) as cm:
+            api.method('getPage', path='Hey-01-17-2')
+
+        self.assertEqual(cm.exception.retry_after, 3)
+
+    def test_error(self, sleep):
+        api = make_api(
+            StubSession({'ok': False, 'error': 'PAGE_NOT_FOUND'}),
+            retry=RetryPolicy()
+        )
+
+        with self.assertRaises(TelegraphException):
+            api.method('getPage', path='Hey-01-17-2')
+
+    def test_flood_wait_retried(self, sleep):
+        session = StubSession(
+            {'ok': False, 'error': 'FLOOD_WAIT_0'},
+            {'ok': True, 'result': {'path': 'Hey-01-17-2'}},
+        )
+        api = make_api(session, retry=RetryPolicy(flood_jitter=0))
+
+        self.assertEqual(
+            api.method('getPage', path='Hey-01-17-2'),
+            {'path': 'Hey-01-17-2'}
+        )
+        self.assertEqual(len(session.requests), 2)
+
+    def test_flood_wait_budget(self, sleep):
+        session = StubSession(*[{'ok': False, 'error': 'FLOOD_WAIT_0'}] * 3)
+        api = make_api(session, retry=RetryPolicy(max_retries=2))
+
+        with self.assertRaises(RetryAfterError):
+            api.method('getPage', path='Hey-01-17-2')
+
+        self.assertEqual(len(session.requests), 3)
+
+    def test_long_flood_wait_not_retried(self, sleep):
+        session = StubSession({'ok': False, 'error': 'FLOOD_WAIT_300'})
+        api = make_api(session, retry=RetryPolicy(max_retry_after=60))
+
+        with self.assertRaises(RetryAfterError):
+            api.method('getPage', path='Hey-01-17-2')
+
+        self.assertEqual(len(session.requests), 1)
+
+    def test_flood_deadline_shared(self, sleep):
+        flood_deadlines.defer(('telegra.ph', 'token'), 10)
+
+        api = make_api(
+            StubSession({'ok': True, 'result': {}}),
+            retry=RetryPolicy(flood_jitter=0)
+        )
+        api.method('getAccountInfo')
+
+        self.assertAlmostEqual(sleep.call_args[0][0], 10, delta=1)
+
+        other_api = make_api(
+            StubSession({'ok': True, 'result': {}}),
+            retry=RetryPolicy(),
+            access_token='other_token'
+        )
+        other_api.method('getAccountInfo')
+
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_long_flood_wait_shared(self, sleep):
+        api = make_api(
+            StubSession({'ok': False, 'error': 'FLOOD_WAIT_300'}),
+            retry=RetryPolicy(max_retry_after=60)
+        )
+
+        with self.assertRaises(RetryAfterError):
+            api.method('getPage', path='Hey-01-17-2')
+
+        other_session = StubSession({'ok': True, 'result': {}})
+        other_api = make_api(
+            other_session, retry=RetryPolicy(max_retry_after=60)
+        )
+
+        with self.assertRaises(RetryAfterError) as cm:
+            other_api.method('getAccountInfo')
+
+        self.assertAlmostEqual(cm.exception.retry_after, 300, delta=1)
+        self.assertEqual(other_session.requests, [])
+
+        patient_api = make_api(
+            other_session,
+            retry=RetryPolicy(max_retry_after=600, flood_jitter=0)
+        )
+        patient_api.method('getAccountInfo')
+
+        self.assertAlmostEqual(sleep.call_args[0][0], 300, delta=1)
+        self.assertEqual(len(other_session.requests), 1)
+
+    def test_transport_error_retried(self, sleep):
+        session = StubSession(
+            requests.ConnectionError(),
+            {'ok': True, 'result': {}},
+        )
+        api = make_api(session, retry=RetryPolicy(backoff_base=1))
+
+        self.assertEqual(api.method('getAccountInfo'), {})
+        self.assertEqual(len(session.requests), 2)
+        self.assertLessEqual(sleep.call_args[0][0], 1)
+
+    def test_upload_retried(self, sleep):
+        f = io.BytesIO(b'GIF89a')
+        session = StubSession(
+            {'error': 'FLOOD_WAIT_0'},
+            [{'src': '/file/123.gif'}],
+        )
+        api = make_api(session, retry=RetryPolicy())
+
+        self.assertEqual(api.upload_file(f), [{'src': '/file/123.gif'}])
+        self.assertEqual(
+            [files for _, _, files in session.requests],
+            [[b'GIF89a'], [b'GIF89a']]
+        )
+
+
+class TestSession(TestCase):
+    def test_close(self):
+        with TelegraphApi() as api:
+            session = api.session
+
+        self.assertTrue(api.owns_session)
+        with mock.patch.object(session, 'close') as close:
+            api.close()
+        close.assert_called_once_with()
+
+    def test_injected_session_not_closed(self):
+        session = mock.Mock()
+
+        with TelegraphApi(session=session) as api:
+            self.assertIs(api.session, session)
+
+        session.close.assert_not_called()
+
+    def test_async_session_options(self):
+        import asyncio
+        from telegraph import aio
+
+        async def main():
+            async with aio.Telegraph(session_options={'timeout': 3}) as telegraph:
+                session = telegraph._telegraph.session
+                self.assertEqual(session.timeout.read, 3)
+
+            self.assertTrue(session.is_closed)
+
+        asyncio.run(main())
+
+    def test_session_options(self):
+        api = TelegraphApi(session_options={'pool_maxsize': 32, 'timeout': 3})
+        adapter = api.session.get_adapter('https://api.telegra.ph/')
+
+        self.assertEqual(adapter._pool_maxsize, 32)
+
+        with mock.patch.object(HTTPAdapter, 'send') as send:
+            send.side_effect = requests.ConnectionError
+            with self.assertRaises(requests.ConnectionError):
+                api.method('getAccountInfo')
+
+            self.assertEqual(send.call_args[1]['timeout'], 3)
+
+            with self.assertRaises(requests.ConnectionError):
+                api.session.post('https://api.telegra.ph/', timeout=1)
+
+            self.assertEqual(send.call_args[1]['timeout'], 1)
+
+        self.assertNotIn('request', vars(api.session))
+
+        session = pickle.loads(pickle.dumps(api.session))
+        self.assertEqual(
+            session.get_adapter('https://api.telegra.ph/').timeout, 3
+        )
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import threading
+import time
+from unittest import TestCase
+
+from telegraph import Telegraph
+from telegraph import aio
+from telegraph.batch import bounded_map
+from telegraph.exceptions import TelegraphException
+
+from .test_api import StubResponse, StubSession
+
+
+class CreatePageSession:
+    """Creates a page named after the title, fails on empty titles"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def create_page(self, data):
+        if not data['title']:
+            return {'ok': False, 'error': 'TITLE_REQUIRED'}
+
+        content = json.loads(data['content'])
+        return {'ok': True, 'result': {'path': data['title'], 'content': content}}
+
+    def post(self, url, data=None, files=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(0.01)
+
+        with self.lock:
+            self.running -= 1
+
+        return StubResponse(self.create_page(data))
+
+
+class AsyncCreatePageSession(CreatePageSession):
+    async def post(self, url, data=None, files=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+
+        return StubResponse(self.create_page(data))
+
+
+PAGES = [
+    {'title': str(i), 'html_content': '<p>{}</p>'.format(i)} for i in range(10)
+]
+PAGES[3] = {'title': '', 'html_content': '<p>3</p>'}
+
+
+class TestBatch(TestCase):
+    def assert_results(self, results):
+        results.sort(key=lambda r: r.index)
+
+        self.assertEqual(
+            [r.result['path'] for r in results if r.error is None],
+            [str(i) for i in range(10) if i != 3]
+        )
+        self.assertIsInstance(results[3].error, TelegraphException)
+        self.assertIs(results[3].item, PAGES[3])
+
+    def test_bounded_map_ordered(self):
+        results = list(bounded_map(lambda i: i * 2, range(20), concurrency=3))
+
+        self.assertEqual([r.result for r in results], list(range(0, 40, 2)))
+        self.assertEqual([r.index for r in results], list(range(20)))
+
+    def test_bounded_map_lazy(self):
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        consumed = []
+        results = bounded_map(lambda i: i, items(), concurrency=2)
+        next(results)
+        results.close()
+
+        self.assertLess(len(consumed), 5)
+
+    def test_create_pages(self):
+        telegraph = Telegraph()
+        session = telegraph._telegraph.session = CreatePageSession()
+
+        results = list(telegraph.create_pages(PAGES, concurrency=4))
+
+        self.assertEqual([r.index for r in results], list(range(10)))
+        self.assert_results(results)
+        self.assertEqual(session.max_running, 4)
+
+    def test_create_pages_unordered(self):
+        telegraph = Telegraph()
+        telegraph._telegraph.session = CreatePageSession()
+
+        self.assert_results(
+            list(telegraph.create_pages(PAGES, concurrency=4, ordered=False))
+        )
+
+    def test_create_pages_async(self):
+        async def create_pages(ordered):
+            telegraph = aio.Telegraph()
+            session = telegraph._telegraph.session = AsyncCreatePageSession()
+
+            results = [
+                r async for r in telegraph.create_pages(
+                    PAGES, concurrency=4, ordered=ordered
+                )
+            ]
+            self.assertEqual(session.max_running, 4)
+            return results
+
+        self.assert_results(asyncio.run(create_pages(True)))
+        self.assert_results(asyncio.run(create_pages(False)))
+
+
+class PageListSession:
+    def __init__(self, total_count):
+        self.total_count = total_count
+        self.offsets = []
+
+    def get_page_list(self, data):
+        offset, limit = data['offset'], data['limit']
+        self.offsets.append(offset)
+
+        return {'ok': True, 'result': {
+            'total_count': self.total_count,
+            'pages': [
+                {'path': str(i)}
+                for i in range(offset, min(offset + limit, self.total_count))
+            ]
+        }}
+
+    def post(self, url, data=None, files=None):
+        return StubResponse(self.get_page_list(data))
+
+
+class AsyncPageListSession(PageListSession):
+    async def post(self, url, data=None, files=None):
+        return StubResponse(self.get_page_list(data))
+
+
+class TestIterPages(TestCase):
+    def test_iter_pages(self):
+        for total_count in [0, 1, 9, 10, 11, 55]:
+            telegraph = Telegraph()
+            session = telegraph._telegraph.session = PageListSession(total_count)
+
+            pages = list(telegraph.iter_pages(limit=10, prefetch=2))
+
+            self.assertEqual(
+                [page['path'] for page in pages],
+                [str(i) for i in range(total_count)]
+            )
+            self.assertEqual(
+                sorted(set(session.offsets)), session.offsets
+            )
+            self.assertLessEqual(len(session.offsets), total_count // 10 + 3)
+
+    def test_iter_pages_async(self):
+        async def iter_pages():
+            telegraph = aio.Telegraph()
+            telegraph._telegraph.session = AsyncPageListSession(55)
+
+            return [page async for page in telegraph.iter_pages(limit=10)]
+
+        self.assertEqual(
+            [page['path'] for page in asyncio.run(iter_pages())],
+            [str(i) for i in range(55)]
+        )
+
+    def test_iter_pages_bad_args(self):
+        telegraph = Telegraph()
+        session = telegraph._telegraph.session = PageListSession(5)
+
+        for kwargs in [{'limit': 0}, {'limit': 201}, {'prefetch': -1}]:
+            with self.assertRaises(ValueError):
+                next(telegraph.iter_pages(**kwargs))
+
+        async def iter_pages():
+            telegraph = aio.Telegraph()
+            telegraph._telegraph.session = session
+
+            with self.assertRaises(ValueError):
+                await telegraph.iter_pages(limit=0).__anext__()
+
+        asyncio.run(iter_pages())
+
+        self.assertEqual(session.offsets, [])
+
+    def test_iter_pages_error(self):
+        telegraph = Telegraph()
+        telegraph._telegraph.session = StubSession(
+            {'ok': False, 'error': 'ACCESS_TOKEN_INVALID'},
+            {'ok': False, 'error': 'ACCESS_TOKEN_INVALID'},
+        )
+
+        with self.assertRaises(TelegraphException):
+            list(telegraph.iter_pages())
@@ -0,0 +1,245 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase, mock
+
+from telegraph import Telegraph
+from telegraph.aio import Telegraph as AsyncTelegraph
+from telegraph.cache import PageCache, SqlitePageCache
+from telegraph.testing import FakeTelegraphServer
+
+
+class TestPageCache(TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        self.cache = PageCache(maxsize=2)
+        self.telegraph = Telegraph(
+            session=self.server.session(), page_cache=self.cache
+        )
+        self.telegraph.create_account('test')
+        self.path = self.telegraph.create_page(
+            'Title', html_content='<p>Hello</p>'
+        )['path']
+
+    def test_get_page(self):
+        page = self.telegraph.get_page(self.path)
+        page['title'] = 'modified'
+
+        self.assertEqual(self.telegraph.get_page(self.path)['title'], 'Title')
+        self.assertEqual(self.telegraph.get_page(self.path)['content'],
+                         '<p>Hello</p>')
+        self.assertEqual(len(self.server.requests_for('getPage')), 1)
+
+        # other arguments are cached separately
+        page = self.telegraph.get_page(self.path, return_html=False)
+        self.assertEqual(page['content'], [{'tag': 'p', 'children': ['Hello']}])
+        self.assertEqual(len(self.server.requests_for('getPage')), 2)
+
+        self.assertEqual(tuple(self.cache.info()), (2, 2, 2, 2))
+
+    def test_edit_page_invalidates(self):
+        self.telegraph.get_page(self.path)
+        self.telegraph.edit_page(self.path, 'New', html_content='<p>Bye</p>')
+
+        page = self.telegraph.get_page(self.path)
+        self.assertEqual(page['title'], 'New')
+        self.assertEqual(page['content'], '<p>Bye</p>')
+
+    def test_lru(self):
+        paths = [self.path] + [
+            self.telegraph.create_page('Page', html_content='x')['path']
+            for _ in range(2)
+        ]
+
+        self.telegraph.get_page(paths[0])
+        self.telegraph.get_page(paths[1])
+        self.telegraph.get_page(paths[0])
+        self.telegraph.get_page(paths[2])  # evicts paths[1]
+
+        self.server.requests.clear()
+        self.telegraph.get_page(paths[0])
+        self.telegraph.get_page(paths[1])
+
+        self.assertEqual(
+            [path for _, path, _ in self.server.requests_for('getPage')],
+            [paths[1]]
+        )
+
+    def test_ttl(self):
+        cache = PageCache(ttl=10)
+
+        with mock.patch('telegraph.cache.time.time', return_value=100):
+            cache.set(('path', True, True), {'title': 'Title'})
+
+        with mock.patch('telegraph.cache.time.time', return_value=109):
+            self.assertEqual(
+                cache.get(('path', True, True)), {'title': 'Title'}
+            )
+
+        with mock.patch('telegraph.cache.time.time', return_value=110):
+            self.assertIsNone(cache.get(('path', True, True)))
+
+        self.assertEqual(cache.info().currsize, 0)
+
+    def test_async(self):
+        async def get_pages():
+            telegraph = AsyncTelegraph(
+                session=self.server.async_session(), page_cache=self.cache,
+                access_token=self.telegraph.get_access_token()
+            )
+
+            first = await telegraph.get_page(self.path)
+            second = await telegraph.get_page(self.path)
+            await telegraph.edit_page(self.path, 'New', html_content='y')
+            third = await telegraph.get_page(self.path)
+
+            return first, second, third
+
+        first, second, third = asyncio.run(get_pages())
+
+        self.assertEqual(first, second)
+        self.assertEqual(third['title'], 'New')
+        self.assertEqual(len(self.server.requests_for('getPage')), 2)
+
+
+class TestSqlitePageCache(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.filename = os.path.join(tmp.name, 'pages.sqlite')
+
+        self.server = FakeTelegraphServer()
+        telegraph = Telegraph(session=self.server.session())
+        telegraph.create_account('test')
+        self.path = telegraph.create_page(
+            'Title', html_content='<p>Hello</p>'
+        )['path']
+
+    def make_telegraph(self, **kwargs):
+        cache = SqlitePageCache(self.filename, **kwargs)
+        self.addCleanup(cache.close)
+
+        return Telegraph(session=self.server.session(), page_cache=cache)
+
+    def test_persistent(self):
+        telegraph = self.make_telegraph()
+        page = telegraph.get_page(self.path)
+        nodes_page = telegraph.get_page(self.path, return_html=False)
+
+        # after restart
+        telegraph = self.make_telegraph()
+        self.assertEqual(telegraph.get_page(self.path), page)
+        self.assertEqual(
+            telegraph.get_page(self.path, return_html=False), nodes_page
+        )
+        self.assertEqual(len(self.server.requests_for('getPage')), 2)
+
+        telegraph.page_cache.invalidate(self.path)
+        self.assertEqual(len(telegraph.page_cache), 0)
+
+    def test_expired(self):
+        telegraph = self.make_telegraph(ttl=10)
+
+        with mock.patch('telegraph.cache.time.time', return_value=100):
+            telegraph.get_page(self.path)
+
+        with mock.patch('telegraph.cache.time.time', return_value=110):
+            telegraph.get_page(self.path)
+
+        self.assertEqual(len(self.server.requests_for('getPage')), 2)
+
+        # lookups don't write, expired responses are purged
+        cache = telegraph.page_cache
+
+        with mock.patch('telegraph.cache.time.time', return_value=120):
+            self.assertEqual(
+                cache.lookup((self.path, True, True)), (None, False)
+            )
+            self.assertEqual(len(cache), 1)
+
+            cache.purge()
+            self.assertEqual(len(cache), 0)
+
+    def test_background_refresh(self):
+        telegraph = self.make_telegraph(refresh_after=60)
+        cache = telegraph.page_cache
+
+        with mock.patch('telegraph.cache.time.time', return_value=100):
+            page = telegraph.get_page(self.path)
+
+        self.server.pages[self.path]['title'] = 'New'
+        self.server.latency = 0.1
+
+        with mock.patch('telegraph.cache.time.time', return_value=200):
+            # stale pages are returned and refreshed only once
+            self.assertEqual(telegraph.get_page(self.path), page)
+            self.assertEqual(telegraph.get_page(self.path), page)
+
+            deadline = time.monotonic() + 5
+            while cache._refreshing and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(telegraph.get_page(self.path)['title'], 'New')
+
+        self.assertEqual(len(self.server.requests_for('getPage')), 2)
+
+    def test_background_refresh_async(self):
+        cache = SqlitePageCache(self.filename, refresh_after=60)
+        self.addCleanup(cache.close)
+
+        async def get_pages():
+            telegraph = AsyncTelegraph(
+                session=self.server.async_session(), page_cache=cache
+            )
+
+            with mock.patch('telegraph.cache.time.time', return_value=100):
+                first = await telegraph.get_page(self.path)
+
+            self.server.pages[self.path]['title'] = 'New'
+
+            with mock.patch('telegraph.cache.time.time', return_value=200):
+                second = await telegraph.get_page(self.path)
+
+                while cache._refreshing:
+                    await asyncio.sleep(0)
+
+                third = await telegraph.get_page(self.path)
+
+            return first, second, third
+
+        first, second, third = asyncio.run(get_pages())
+
+        self.assertEqual(first, second)
+        self.assertEqual(third['title'], 'New')
+
+    def test_async_queries_offloaded(self):
+        cache = SqlitePageCache(self.filename)
+        self.addCleanup(cache.close)
+        threads = []
+
+        for name in ('lookup', 'set', 'invalidate'):
+            method = getattr(cache, name)
+
+            def record(*args, method=method):
+                threads.append(threading.get_ident())
+                return method(*args)
+
+            setattr(cache, name, record)
+
+        async def get_and_edit():
+            telegraph = AsyncTelegraph(
+                session=self.server.async_session(), page_cache=cache
+            )
+            await telegraph.create_account('test')
+            page = await telegraph.create_page('Title', content=['x'])
+            path = page['path']
+
+            await telegraph.get_page(path)
+            await telegraph.edit_page(path, 'Title', content=['y'])
+
+        asyncio.run(get_and_edit())
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.get_ident(), threads)
@@ -0,0 +1,116 @@
+import importlib.util
+import os
+import textwrap
+from unittest import TestCase, skipIf
+
+try:
+    import libcst
+except ImportError:  # pragma: no cover
+    libcst = None
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_generator():
+    spec = importlib.util.spec_from_file_location(
+        'generate_async_api', os.path.join(ROOT, 'generate_async_api.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+SYNC_SOURCE = textwrap.dedent('''\
+    import time
+
+    import requests
+
+
+    class Client:
+        def __enter__(self):
+            return self
+
+        def close(self):
+            self.session.close()
+
+        def send(self, files):
+            opener = FilesOpener(files)
+            for attempt in range(3):
+                with opener as opened:
+                    try:
+                        return self.session.post(**multipart_kwargs(opened))
+                    except requests.ConnectionError:
+                        time.sleep(1)
+
+        def status(self, files):
+            return self.send(files)['ok']
+
+        def save(self, store, f):
+            call_blocking(store.set, file_hash(f))
+
+        def iter_results(self, items):
+            for result in bounded_map(self.send, items):
+                yield result
+
+        def collect(self, items):
+            return [result for result in self.iter_results(items)]
+
+        def local(self):
+            return 1
+''')
+
+ASYNC_SOURCE = textwrap.dedent('''\
+    import asyncio
+
+    import httpx
+
+
+    class Client:
+        async def __aenter__(self):
+            return self
+
+        async def aclose(self):
+            await self.session.aclose()
+
+        async def send(self, files):
+            opener = AsyncFilesOpener(files)
+            for attempt in range(3):
+                async with opener as opened:
+                    try:
+                        return await self.session.post(**async_multipart_kwargs(opened))
+                    except httpx.NetworkError:
+                        await asyncio.sleep(1)
+
+        async def status(self, files):
+            return (await self.send(files))['ok']
+
+        async def save(self, store, f):
+            await async_call_blocking(store.set, await async_file_hash(f))
+
+        async def iter_results(self, items):
+            async for result in async_bounded_map(self.send, items):
+                yield result
+
+        async def collect(self, items):
+            return [result async for result in self.iter_results(items)]
+
+        def local(self):
+            return 1
+''')
+
+
+@skipIf(libcst is None, 'libcst is not installed')
+class TestGenerateAsyncApi(TestCase):
+    def setUp(self):
+        self.generator = load_generator()
+
+    def test_aio_up_to_date(self):
+        self.assertTrue(
+            self.generator.is_up_to_date(),
+            'telegraph/aio.py is out of date, '
+            'run `python generate_async_api.py`'
+        )
+
+    def test_generate(self):
+        self.assertEqual(self.generator.generate(SYNC_SOURCE), ASYNC_SOURCE)
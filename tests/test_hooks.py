@@ -0,0 +1,120 @@
+import asyncio
+import io
+from unittest import TestCase
+
+import requests
+
+from telegraph import Telegraph
+from telegraph.aio import Telegraph as AsyncTelegraph
+from telegraph.exceptions import TelegraphException
+from telegraph.hooks import MetricsCollector, RequestHooks, LATENCY_BUCKETS
+from telegraph.retry import RetryPolicy
+from telegraph.testing import FakeTelegraphServer
+
+from .test_api import StubSession
+
+
+class RecordingHooks(RequestHooks):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(('before_request', event.method, event.attempt))
+
+    def after_response(self, event, response):
+        self.calls.append(('after_response', event.method, event.attempt))
+
+    def on_error(self, event, error):
+        self.calls.append(('on_error', event.method, type(error).__name__))
+
+
+class TestHooks(TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        self.metrics = MetricsCollector()
+        self.hooks = RecordingHooks()
+        self.telegraph = Telegraph(
+            session=self.server.session(),
+            retry=RetryPolicy(flood_jitter=0),
+            hooks=[self.hooks, self.metrics]
+        )
+
+    def test_calls(self):
+        self.telegraph.create_account('test')
+        self.server.inject_flood_wait(0)
+        self.telegraph.get_account_info()
+
+        self.assertEqual(self.hooks.calls, [
+            ('before_request', 'createAccount', 0),
+            ('after_response', 'createAccount', 0),
+            ('before_request', 'getAccountInfo', 0),
+            ('on_error', 'getAccountInfo', 'RetryAfterError'),
+            ('before_request', 'getAccountInfo', 1),
+            ('after_response', 'getAccountInfo', 1),
+        ])
+
+    def test_metrics(self):
+        self.telegraph.create_account('test')
+        page = self.telegraph.create_page('Title', html_content='<p>Hi</p>')
+
+        with self.assertRaises(TelegraphException):
+            self.telegraph.get_page('missing')
+
+        self.server.inject_flood_wait(0)
+        self.telegraph.get_page(page['path'])
+
+        self.telegraph.upload_file((io.BytesIO(b'GIF89a'), 'image.gif'))
+
+        snapshot = self.metrics.snapshot()
+
+        self.assertEqual(
+            sorted(snapshot),
+            ['createAccount', 'createPage', 'getPage', 'upload']
+        )
+
+        get_page = snapshot['getPage']
+        self.assertEqual(get_page['requests'], 3)
+        self.assertEqual(get_page['retries'], 1)
+        self.assertEqual(
+            get_page['errors'], {'PAGE_NOT_FOUND': 1, 'FLOOD_WAIT': 1}
+        )
+        self.assertEqual(sum(get_page['latency']['buckets'].values()), 3)
+        self.assertEqual(
+            len(get_page['latency']['buckets']), len(LATENCY_BUCKETS) + 1
+        )
+        self.assertGreater(get_page['bytes_received'], 0)
+
+        self.assertGreater(snapshot['createPage']['bytes_sent'],
+                           len('<p>Hi</p>'))
+        self.assertEqual(snapshot['upload']['bytes_sent'], len(b'GIF89a'))
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_transport_error(self):
+        telegraph = Telegraph(
+            session=StubSession(requests.ConnectionError()),
+            hooks=[self.metrics]
+        )
+
+        with self.assertRaises(requests.ConnectionError):
+            telegraph.get_page('path')
+
+        self.assertEqual(
+            self.metrics.snapshot()['getPage']['errors'],
+            {'ConnectionError': 1}
+        )
+
+    def test_async(self):
+        async def run():
+            telegraph = AsyncTelegraph(
+                session=self.server.async_session(), hooks=[self.hooks]
+            )
+            await telegraph.create_account('test')
+
+        asyncio.run(run())
+
+        self.assertEqual(self.hooks.calls, [
+            ('before_request', 'createAccount', 0),
+            ('after_response', 'createAccount', 0),
+        ])
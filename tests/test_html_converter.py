@@ -1,7 +1,11 @@
+from io import BytesIO, StringIO
 from unittest import TestCase
 
 from telegraph.exceptions import NotAllowedTag, InvalidHTML
-from telegraph.utils import html_to_nodes, nodes_to_html
+from telegraph.utils import (
+    html_to_nodes, nodes_to_html, stream_html_to_nodes, iter_nodes_html,
+    write_nodes_html, HtmlToNodesParser, UnsupportedMarkup
+)
 
 HTML_TEST_STR = """
 <p>Hello, world!<br/></p>
@@ -47,6 +51,28 @@ HTML_MULTI_LINES_NODES_LIST = [
 
 HTML_NO_STARTTAG = "</a><h1></h1>"
 
+HTML_TOKENIZER_SAMPLES = [
+    HTML_TEST_STR,
+    HTML_MULTI_LINES,
+    '<P CLASS=x>a &lt; b &amp;&amp; c &gt; d</P>',
+    '<img src="a.png" alt=\'it"s\' data-x = "&quot;q&quot;"/>',
+    '<video controls\nsrc=v.mp4></video>',
+    '<a href="">x</a><a href=\'\'>y</a>',
+    '<p>a < b<br/>\u00a0\u2003 c\t\r\nd </p>',
+    '<pre>  keep\n  <b> this </b>\n</pre> collapse   this ',
+    '<pre>x<br>y</pre>  after  pre',
+    '<p>caf&eacute; &#169; &#x263a; &bogus; &amp</p>',
+    'trailing   text  ',
+]
+
+HTML_TOKENIZER_UNSUPPORTED = [
+    '<p>a<!-- comment -->b</p>',
+    '<!DOCTYPE html><p>x</p>',
+    '<p data-x=\u00a0y>x</p>',
+    '<p>x</p >trailing &amp',
+    '<p>x</p><',
+]
+
 
 class TestHTMLConverter(TestCase):
     def test_html_to_nodes(self):
@@ -141,3 +167,87 @@ class TestHTMLConverter(TestCase):
     def test_no_starttag_node(self):
         with self.assertRaises(InvalidHTML):
              html_to_nodes(HTML_NO_STARTTAG)
+
+    def test_fast_tokenizer(self):
+        for html in HTML_TOKENIZER_SAMPLES:
+            parser = HtmlToNodesParser()
+            parser.feed(html)
+
+            fast_parser = HtmlToNodesParser()
+            fast_parser.feed_fast(html)
+
+            self.assertEqual(fast_parser.get_nodes(), parser.get_nodes())
+
+    def test_fast_tokenizer_unsupported(self):
+        for html in HTML_TOKENIZER_UNSUPPORTED:
+            with self.assertRaises(UnsupportedMarkup):
+                HtmlToNodesParser().feed_fast(html)
+
+            parser = HtmlToNodesParser()
+            parser.feed(html)
+
+            self.assertEqual(html_to_nodes(html), parser.get_nodes())
+
+    def test_stream_html_to_nodes(self):
+        self.assertEqual(
+            stream_html_to_nodes(HTML_TEST_STR), NODES_TEST_LIST
+        )
+
+        chunks = [HTML_TEST_STR[i:i + 7] for i in range(0, len(HTML_TEST_STR), 7)]
+        self.assertEqual(stream_html_to_nodes(chunks), NODES_TEST_LIST)
+
+        self.assertEqual(
+            stream_html_to_nodes(StringIO(HTML_TEST_STR), chunk_size=5),
+            NODES_TEST_LIST
+        )
+
+    def test_stream_html_to_nodes_bytes(self):
+        html = '<p>привет, мир &amp; AT&T</p>'
+        encoded = html.encode('utf-8')
+
+        # chunk boundaries split multibyte characters
+        for chunk_size in (1, 3, 1024):
+            self.assertEqual(
+                stream_html_to_nodes(BytesIO(encoded), chunk_size=chunk_size),
+                [{'tag': 'p', 'children': ['привет, мир & AT&T']}]
+            )
+
+        self.assertEqual(
+            stream_html_to_nodes(html.encode('cp1251'), encoding='cp1251'),
+            html_to_nodes(html)
+        )
+
+    def test_stream_html_to_nodes_error(self):
+        consumed = []
+
+        def chunks():
+            for chunk in ('<p>ok</p>', '<script>', '<p>never read</p>'):
+                consumed.append(chunk)
+                yield chunk
+
+        with self.assertRaises(NotAllowedTag):
+            stream_html_to_nodes(chunks())
+
+        self.assertEqual(len(consumed), 2)
+
+    def test_iter_nodes_html(self):
+        chunks = list(iter_nodes_html(NODES_TEST_LIST, batch_size=3))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), HTML_TEST_STR)
+
+        self.assertEqual(
+            list(iter_nodes_html(NODES_TEST_LIST, batch_size=None)),
+            [HTML_TEST_STR]
+        )
+        self.assertEqual(list(iter_nodes_html([])), [])
+
+    def test_write_nodes_html(self):
+        f = StringIO()
+        write_nodes_html(NODES_TEST_LIST, f, batch_size=2)
+        self.assertEqual(f.getvalue(), HTML_TEST_STR)
+
+        nodes = [{'tag': 'p', 'children': ['привет']}]
+        f = BytesIO()
+        write_nodes_html(nodes, f, encoding='utf-8')
+        self.assertEqual(f.getvalue(), '<p>привет</p>'.encode('utf-8'))
@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+import telegraph
+from telegraph import utils
+from telegraph.jsonlib import json_dumps
+
+
+HEAVY_MODULES = ('requests', 'httpx', 'asyncio', 'mimetypes', 'hashlib')
+
+
+def imported_modules(statement):
+    code = '{}; import sys; print(" ".join(sys.modules))'.format(statement)
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        stdout=subprocess.PIPE, check=True, universal_newlines=True
+    ).stdout
+
+    return set(output.split())
+
+
+class TestLazyImports(TestCase):
+    def test_package_import(self):
+        modules = imported_modules('import telegraph')
+
+        for name in HEAVY_MODULES + ('telegraph.api', 'telegraph.utils'):
+            self.assertNotIn(name, modules)
+
+    def test_utils_import(self):
+        modules = imported_modules('from telegraph.utils import html_to_nodes')
+
+        for name in HEAVY_MODULES + ('telegraph.api',):
+            self.assertNotIn(name, modules)
+
+    def test_lazy_attributes(self):
+        from telegraph.api import Telegraph, TelegraphException
+        from telegraph.upload import upload_file
+
+        self.assertIs(telegraph.Telegraph, Telegraph)
+        self.assertIs(telegraph.TelegraphException, TelegraphException)
+        self.assertIs(telegraph.upload_file, upload_file)
+        self.assertIs(utils.json_dumps, json_dumps)
+
+        self.assertIn('Telegraph', dir(telegraph))
+
+        with self.assertRaises(AttributeError):
+            telegraph.missing
+
+        with self.assertRaises(AttributeError):
+            utils.missing
+
+    def test_submodule_attributes(self):
+        code = (
+            'import telegraph; '
+            'print(telegraph.api.Telegraph.__name__, '
+            'telegraph.utils.html_to_nodes.__name__, '
+            'telegraph.exceptions.TelegraphException.__name__, '
+            'telegraph.upload.upload_file.__name__)'
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            stdout=subprocess.PIPE, check=True, universal_newlines=True
+        ).stdout
+
+        self.assertEqual(
+            output.split(),
+            ['Telegraph', 'html_to_nodes', 'TelegraphException', 'upload_file']
+        )
+        self.assertIn('utils', dir(telegraph))
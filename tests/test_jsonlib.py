@@ -0,0 +1,88 @@
+import json
+import math
+from unittest import TestCase
+
+from telegraph import jsonlib
+from telegraph.jsonlib import (
+    json_dumps, json_loads, load_response, set_json_backend, get_json_backend
+)
+from telegraph.utils import html_to_nodes
+
+from .test_html_converter import NODES_TEST_LIST
+
+
+NODES = NODES_TEST_LIST + html_to_nodes(
+    '<p>привет "мир" \\ / <b>\x00\x1f\x7f  😀</b></p>'
+    '<pre>\tcode\r\n</pre>'
+)
+
+EXPECTED = json.dumps(NODES, separators=(',', ':'), ensure_ascii=False)
+
+
+class JsonResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TestJsonBackends(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, jsonlib, '_backend', jsonlib._backend)
+
+    def available_backends(self):
+        for name in jsonlib.BACKENDS_PREFERENCE:
+            try:
+                set_json_backend(name)
+            except ImportError:
+                continue
+
+            yield name
+
+    def test_same_output(self):
+        for name in self.available_backends():
+            with self.subTest(backend=name):
+                self.assertEqual(json_dumps(NODES), EXPECTED)
+                self.assertEqual(json_loads(EXPECTED), NODES)
+                self.assertEqual(
+                    json_loads(EXPECTED.encode('utf-8')), NODES
+                )
+
+    def test_stdlib_fallback(self):
+        values = [2 ** 70, '\ud800', {1: 'a'}, [(1, 2)]]
+
+        for name in self.available_backends():
+            with self.subTest(backend=name):
+                for value in values:
+                    self.assertEqual(
+                        json_dumps(value),
+                        json.dumps(
+                            value, separators=(',', ':'), ensure_ascii=False
+                        )
+                    )
+
+                self.assertTrue(math.isnan(json_loads('NaN')))
+                self.assertEqual(
+                    json_dumps({'b': 1, 'a': 2}, sort_keys=True),
+                    '{"a":2,"b":1}'
+                )
+
+    def test_load_response(self):
+        for name in self.available_backends():
+            with self.subTest(backend=name):
+                response = JsonResponse(EXPECTED.encode('utf-8'))
+                self.assertEqual(load_response(response), NODES)
+
+                with self.assertRaises(ValueError):
+                    load_response(JsonResponse(b'<html>502</html>'))
+
+    def test_set_json_backend(self):
+        set_json_backend('json')
+        self.assertIs(get_json_backend(), jsonlib.STDLIB_BACKEND)
+
+        set_json_backend()
+        self.assertIn(get_json_backend().name, jsonlib.BACKENDS_PREFERENCE)
+
+        with self.assertRaises(ValueError):
+            set_json_backend('simplejson')
@@ -0,0 +1,72 @@
+import copy
+import pickle
+from unittest import TestCase
+
+from telegraph.jsonlib import json_dumps
+from telegraph.nodes import Node, from_dicts, to_dicts
+from telegraph.testing import FakeTelegraphServer
+from telegraph.utils import html_to_nodes, nodes_to_html
+from telegraph import Telegraph
+
+from .test_html_converter import HTML_TEST_STR, NODES_TEST_LIST
+
+
+class TestNodes(TestCase):
+    def test_round_trip(self):
+        nodes = from_dicts(NODES_TEST_LIST)
+
+        self.assertIsInstance(nodes[0], Node)
+        self.assertIsInstance(nodes[0].children, tuple)
+        self.assertEqual(to_dicts(nodes), NODES_TEST_LIST)
+        self.assertEqual(nodes, NODES_TEST_LIST)
+
+    def test_mapping(self):
+        node = Node('a', {'href': '/'}, ['link'])
+
+        self.assertEqual(node['tag'], 'a')
+        self.assertEqual(node['attrs'], {'href': '/'})
+        self.assertEqual(node['children'], ('link',))
+        self.assertEqual(
+            dict(node),
+            {'tag': 'a', 'attrs': {'href': '/'}, 'children': ('link',)}
+        )
+
+        empty = Node('br', {}, [])
+        self.assertEqual(list(empty), ['tag'])
+        self.assertIsNone(empty.get('attrs'))
+
+        with self.assertRaises(KeyError):
+            empty['children']
+
+    def test_nodes_to_html(self):
+        self.assertEqual(
+            nodes_to_html(from_dicts(NODES_TEST_LIST)), HTML_TEST_STR
+        )
+
+    def test_json(self):
+        nodes = from_dicts(NODES_TEST_LIST)
+        self.assertEqual(json_dumps(nodes), json_dumps(NODES_TEST_LIST))
+
+    def test_copy(self):
+        nodes = from_dicts(NODES_TEST_LIST)
+
+        self.assertEqual(pickle.loads(pickle.dumps(nodes)), nodes)
+        self.assertEqual(copy.deepcopy(nodes), nodes)
+
+    def test_deep_tree(self):
+        html = '<ul><li>' * 2000 + 'x' + '</li></ul>' * 2000
+        nodes = to_dicts(from_dicts(html_to_nodes(html)))
+
+        # comparing such deep trees would hit the recursion limit
+        self.assertEqual(nodes_to_html(nodes), html)
+
+    def test_create_page(self):
+        server = FakeTelegraphServer()
+        telegraph = Telegraph(session=server.session())
+        telegraph.create_account('test')
+
+        page = telegraph.create_page(
+            'Title', content=from_dicts(NODES_TEST_LIST), return_content=True
+        )
+
+        self.assertEqual(page['content'], NODES_TEST_LIST)
@@ -0,0 +1,64 @@
+import asyncio
+from unittest import TestCase
+
+from telegraph import Telegraph
+from telegraph.aio import Telegraph as AsyncTelegraph
+from telegraph.profiling import profile, timed, _NULL_TIMER
+from telegraph.testing import FakeTelegraphServer
+
+
+class TestProfiling(TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        self.telegraph = Telegraph(session=self.server.session())
+        self.telegraph.create_account('test')
+
+    def test_profile(self):
+        with profile() as p:
+            page = self.telegraph.create_page(
+                'Title', html_content='<p>Hello</p>'
+            )
+            self.telegraph.get_page(page['path'])
+
+        self.assertEqual(p.counts, {
+            'conversion': 1,
+            'serialization': 1,
+            'network': 2,
+            'deserialization': 2,
+            'response_conversion': 1,
+        })
+        self.assertTrue(all(seconds >= 0 for seconds in p.timings.values()))
+        self.assertEqual(len(p.report().splitlines()), 5)
+
+        # calls outside of the block aren't profiled
+        self.telegraph.get_page(page['path'])
+        self.assertEqual(p.counts['network'], 2)
+        self.assertIs(timed('network'), _NULL_TIMER)
+
+    def test_threads(self):
+        pages = [{'title': 'Title', 'content': ['x']} for _ in range(3)]
+
+        with profile() as p:
+            list(self.telegraph.create_pages(pages, concurrency=3))
+
+        self.assertEqual(p.counts['network'], 3)
+
+    def test_async(self):
+        async def create_pages():
+            telegraph = AsyncTelegraph(
+                self.telegraph.get_access_token(),
+                session=self.server.async_session()
+            )
+
+            with profile() as p:
+                await asyncio.gather(*[
+                    telegraph.create_page('Title', html_content='x')
+                    for _ in range(2)
+                ])
+
+            return p
+
+        p = asyncio.run(create_pages())
+
+        self.assertEqual(p.counts['conversion'], 2)
+        self.assertEqual(p.counts['network'], 2)
@@ -0,0 +1,55 @@
+from unittest import TestCase, mock
+
+from telegraph.api import TelegraphApi
+from telegraph.exceptions import RetryAfterError
+from telegraph.ratelimit import RateLimiter
+
+from .test_api import StubSession
+
+
+class TestRateLimiter(TestCase):
+    @mock.patch('telegraph.ratelimit.time.monotonic', return_value=100.0)
+    def test_reserve(self, monotonic):
+        limiter = RateLimiter(rate=2, burst=2)
+
+        self.assertEqual(limiter.reserve('a'), 0)
+        self.assertEqual(limiter.reserve('a'), 0)
+        self.assertEqual(limiter.reserve('a'), 0.5)
+        self.assertEqual(limiter.reserve('a'), 1.0)
+        self.assertEqual(limiter.reserve('b'), 0)
+
+        monotonic.return_value = 101.0
+        self.assertEqual(limiter.reserve('a'), 0.5)
+
+    def test_adapts_to_flood_wait(self):
+        limiter = RateLimiter(rate=2, min_rate=0.6, recovery=0.1)
+
+        limiter.on_flood_wait('a')
+        self.assertEqual(limiter.current_rate('a'), 1)
+        limiter.on_flood_wait('a')
+        self.assertEqual(limiter.current_rate('a'), 0.6)
+
+        limiter.on_success('a')
+        self.assertAlmostEqual(limiter.current_rate('a'), 0.8)
+
+        for _ in range(100):
+            limiter.on_success('a')
+        self.assertEqual(limiter.current_rate('a'), 2)
+
+    @mock.patch('telegraph.api.time.sleep')
+    def test_api(self, sleep):
+        limiter = RateLimiter(rate=10, burst=1)
+
+        api = TelegraphApi('token', rate_limiter=limiter)
+        api.session = StubSession(
+            {'ok': True, 'result': {}},
+            {'ok': False, 'error': 'FLOOD_WAIT_1'},
+        )
+
+        api.method('getAccountInfo')
+
+        with self.assertRaises(RetryAfterError):
+            api.method('getAccountInfo')
+
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(limiter.current_rate(('telegra.ph', 'token')), 5)
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from telegraph import Telegraph
+from telegraph.aio import Telegraph as AsyncTelegraph
+from telegraph.state import MemoryStateStore, JsonFileStateStore, page_hash
+from telegraph.testing import FakeTelegraphServer
+
+
+class TestStateStore(TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        self.store = MemoryStateStore()
+        self.telegraph = Telegraph(
+            session=self.server.session(), state_store=self.store
+        )
+        self.telegraph.create_account('test')
+
+        self.path = self.telegraph.create_page(
+            'Title', html_content='<p>Hello</p>'
+        )['path']
+
+    def test_page_hash(self):
+        self.assertEqual(page_hash('a', '[]'), page_hash('a', '[]', None))
+        self.assertNotEqual(page_hash('a', '[]'), page_hash('a', '[]', ''))
+        self.assertNotEqual(page_hash('a', '["b"]'), page_hash('ab', '[]'))
+
+    def test_skip_unchanged(self):
+        # state is known from create_page
+        result = self.telegraph.edit_page(
+            self.path, 'Title', html_content='<p>Hello</p>'
+        )
+        self.assertEqual(result['path'], self.path)
+        self.assertEqual(self.server.requests_for('editPage'), [])
+
+        self.telegraph.edit_page(self.path, 'Title', html_content='<p>Bye</p>')
+        self.telegraph.edit_page(self.path, 'Title', html_content='<p>Bye</p>')
+        self.assertEqual(len(self.server.requests_for('editPage')), 1)
+
+        self.telegraph.edit_page(
+            self.path, 'Title', html_content='<p>Bye</p>', author_name='me'
+        )
+        self.assertEqual(len(self.server.requests_for('editPage')), 2)
+
+    def test_return_content(self):
+        result = self.telegraph.edit_page(
+            self.path, 'Title', html_content='<p>Hello</p>',
+            return_content=True
+        )
+        self.assertEqual(result['content'], [{'tag': 'p', 'children': ['Hello']}])
+        self.assertEqual(len(self.server.requests_for('editPage')), 1)
+
+        self.telegraph.edit_page(
+            self.path, 'Title', html_content='<p>Hello</p>',
+            return_content=True
+        )
+        self.assertEqual(len(self.server.requests_for('editPage')), 1)
+
+    def test_delete(self):
+        self.store.delete(self.path)
+        self.telegraph.edit_page(self.path, 'Title', html_content='<p>Hello</p>')
+
+        self.assertEqual(len(self.server.requests_for('editPage')), 1)
+
+    def test_json_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'state.json')
+
+            self.telegraph.state_store = JsonFileStateStore(filename)
+            self.telegraph.edit_page(self.path, 'New', html_content='x')
+
+            telegraph = Telegraph(
+                self.telegraph.get_access_token(),
+                session=self.server.session(),
+                state_store=JsonFileStateStore(filename)
+            )
+            telegraph.edit_page(self.path, 'New', html_content='x')
+
+            self.assertEqual(len(self.server.requests_for('editPage')), 1)
+            self.assertEqual(os.listdir(tmp), ['state.json'])
+
+    def test_json_file_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'state.json')
+
+            store = JsonFileStateStore(filename, compact_min_lines=10)
+            for i in range(100):
+                store.set(str(i % 5), str(i), {'path': str(i % 5)})
+            store.delete('4')
+
+            with open(filename) as f:
+                self.assertLessEqual(len(f.readlines()), 4 + 11)
+
+            # interrupted write
+            with open(filename, 'a') as f:
+                f.write('["5", ["h"')
+
+            store = JsonFileStateStore(filename)
+            self.assertEqual(store.get('3'), ('98', {'path': '3'}))
+            self.assertIsNone(store.get('4'))
+            self.assertIsNone(store.get('5'))
+
+            store.set('5', 'h', {})
+            self.assertEqual(JsonFileStateStore(filename).get('5'), ('h', {}))
+
+    def test_json_file_line_separators(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'state.json')
+
+            store = JsonFileStateStore(filename)
+            title = 'a\u2028b\u2029c\x85d'
+            store.set('a', 'h', {'title': title})
+            store.set('b', 'h', {})
+
+            store = JsonFileStateStore(filename)
+            self.assertEqual(store.get('a'), ('h', {'title': title}))
+            self.assertEqual(store.get('b'), ('h', {}))
+
+    def test_json_file_corrupted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'state.json')
+
+            with open(filename, 'w') as f:
+                f.write('["a", ["h"\n["b", ["h", {}]]\n')
+
+            with self.assertRaises(ValueError):
+                JsonFileStateStore(filename)
+
+            with open(filename) as f:
+                self.assertEqual(f.read(), '["a", ["h"\n["b", ["h", {}]]\n')
+
+    def test_async(self):
+        async def edit():
+            telegraph = AsyncTelegraph(
+                self.telegraph.get_access_token(),
+                session=self.server.async_session(),
+                state_store=self.store
+            )
+
+            for _ in range(2):
+                await telegraph.edit_page(self.path, 'New', html_content='x')
+
+        asyncio.run(edit())
+
+        self.assertEqual(len(self.server.requests_for('editPage')), 1)
+
+    def test_async_write_offloaded(self):
+        threads = []
+
+        class RecordingStore(MemoryStateStore):
+            def set(self, path, page_hash, result):
+                threads.append(threading.get_ident())
+                super().set(path, page_hash, result)
+
+        async def edit():
+            telegraph = AsyncTelegraph(
+                self.telegraph.get_access_token(),
+                session=self.server.async_session(),
+                state_store=RecordingStore()
+            )
+            await telegraph.edit_page(self.path, 'New', html_content='x')
+
+        asyncio.run(edit())
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
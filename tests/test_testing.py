@@ -0,0 +1,95 @@
+import asyncio
+import io
+from unittest import TestCase, mock
+
+from telegraph import Telegraph
+from telegraph import aio
+from telegraph.exceptions import RetryAfterError, TelegraphException
+from telegraph.retry import RetryPolicy, flood_deadlines
+from telegraph.testing import FakeTelegraphServer
+
+
+class TestFakeTelegraphServer(TestCase):
+    def tearDown(self):
+        flood_deadlines._deadlines.clear()
+
+    def test_flow(self):
+        server = FakeTelegraphServer()
+        telegraph = Telegraph(session=server.session())
+
+        response = telegraph.create_account(short_name='python telegraph')
+        self.assertTrue('access_token' in response)
+        self.assertTrue('auth_url' in response)
+
+        response = telegraph.edit_account_info(
+            short_name='Python Telegraph Wrapper'
+        )
+        self.assertEqual(response['short_name'], 'Python Telegraph Wrapper')
+
+        response = telegraph.create_page(
+            'Hey', html_content='<p>Hello, world!</p>'
+        )
+        path = response['path']
+
+        telegraph.edit_page(path, 'Hey', html_content='<p>Hey, world!</p>')
+
+        response = telegraph.get_page(path)
+        self.assertEqual(response['content'], '<p>Hey, world!</p>')
+
+        self.assertEqual(telegraph.get_views(path), {'views': 1})
+        self.assertEqual(telegraph.get_page_list()['total_count'], 1)
+        self.assertEqual(
+            telegraph.get_account_info(['page_count'])['page_count'], 1
+        )
+
+        response = telegraph.upload_file((io.BytesIO(b'GIF89a'), 'image.gif'))
+        self.assertTrue(response[0]['src'].endswith('.gif'))
+
+        telegraph.revoke_access_token()
+        self.assertEqual(telegraph.get_page_list()['total_count'], 1)
+
+    def test_errors(self):
+        server = FakeTelegraphServer()
+        telegraph = Telegraph(session=server.session())
+
+        with self.assertRaisesRegex(TelegraphException, 'PAGE_NOT_FOUND'):
+            telegraph.get_page('Hey-1')
+
+        with self.assertRaisesRegex(TelegraphException, 'ACCESS_TOKEN_INVALID'):
+            telegraph.create_page('Hey', html_content='<p>Hey</p>')
+
+        server.inject_flood_wait(7, method='getPage')
+
+        with self.assertRaises(RetryAfterError) as cm:
+            telegraph.get_page('Hey-1')
+
+        self.assertEqual(cm.exception.retry_after, 7)
+
+    @mock.patch('telegraph.api.time.sleep')
+    def test_flood_wait_retry(self, sleep):
+        server = FakeTelegraphServer()
+        telegraph = Telegraph(
+            session=server.session(),
+            retry=RetryPolicy(flood_jitter=0)
+        )
+        telegraph.create_account('test')
+
+        server.inject_flood_wait(3, count=2)
+        telegraph.create_page('Hey', html_content='<p>Hey</p>')
+
+        self.assertEqual(len(server.requests), 4)
+        self.assertEqual(len(server.pages), 1)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_async(self):
+        server = FakeTelegraphServer(latency=0.001)
+
+        async def main():
+            async with aio.Telegraph(session=server.async_session()) as telegraph:
+                await telegraph.create_account('test')
+                response = await telegraph.create_page(
+                    'Hey', html_content='<p>Hey</p>'
+                )
+                return await telegraph.get_page(response['path'])
+
+        self.assertEqual(asyncio.run(main())['content'], '<p>Hey</p>')
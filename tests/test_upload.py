@@ -0,0 +1,380 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+from unittest import TestCase, mock
+from urllib.request import pathname2url
+
+import httpx
+
+from telegraph import Telegraph, api
+from telegraph.aio import Telegraph as AsyncTelegraph
+from telegraph.exceptions import TelegraphException
+from telegraph.media import media_file
+from telegraph.retry import RetryPolicy
+from telegraph.state import MemoryStateStore
+from telegraph.testing import FakeTelegraphServer, parse_multipart
+from telegraph.utils import (
+    AsyncFilesOpener, FilesOpener, async_multipart_kwargs, get_mimetypes_db,
+    guess_mimetype
+)
+
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 1000
+GIF = b'GIF89a' + b'\x01' * 10
+
+
+class TestAsyncUpload(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        self.filename = os.path.join(tmp.name, 'image.png')
+        with open(self.filename, 'wb') as f:
+            f.write(PNG)
+
+        self.server = FakeTelegraphServer()
+
+    def test_upload_file(self):
+        async def upload():
+            telegraph = AsyncTelegraph(session=self.server.async_session())
+
+            return await telegraph.upload_file(
+                [self.filename, (io.BytesIO(GIF), 'image.gif')]
+            )
+
+        response = asyncio.run(upload())
+
+        self.assertEqual(
+            [self.server.files[file['src']] for file in response], [PNG, GIF]
+        )
+
+    def test_upload_retried(self):
+        self.server.inject_flood_wait(0, method='upload')
+        f = io.BytesIO(b'skipped' + GIF)
+        f.seek(7)
+
+        async def upload():
+            telegraph = AsyncTelegraph(
+                session=self.server.async_session(),
+                retry=RetryPolicy(flood_jitter=0)
+            )
+
+            return await telegraph.upload_file((f, 'image.gif'))
+
+        response = asyncio.run(upload())
+
+        self.assertEqual(self.server.files[response[0]['src']], GIF)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_streamed_body(self):
+        requests = []
+
+        async def handler(request):
+            requests.append((request.headers, await request.aread()))
+            return httpx.Response(200, json=[{'src': '/file/1.png'}])
+
+        async def upload():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+            async with AsyncFilesOpener([self.filename]) as files:
+                kwargs = async_multipart_kwargs(files, chunk_size=100)
+                await client.post('https://telegra.ph/upload', **kwargs)
+
+            await client.aclose()
+
+        asyncio.run(upload())
+
+        (headers, body), = requests
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        self.assertNotIn('Transfer-Encoding', headers)
+        self.assertEqual(
+            parse_multipart(body, headers['Content-Type']),
+            [('file0', ('file0', PNG, 'image/png'))]
+        )
+
+    def test_upload_files(self):
+        files = [(io.BytesIO(GIF), 'image.gif'), self.filename, 'missing.png']
+
+        async def upload():
+            telegraph = AsyncTelegraph(session=self.server.async_session())
+
+            return [
+                result async for result in
+                telegraph.upload_files(files, concurrency=2)
+            ]
+
+        for results in (
+            asyncio.run(upload()),
+            list(Telegraph(session=self.server.session()).upload_files(files))
+        ):
+            self.assertEqual([r.index for r in results], [0, 1, 2])
+            self.assertTrue(results[0].result[0]['src'].endswith('.gif'))
+            self.assertTrue(results[1].result[0]['src'].endswith('.png'))
+            self.assertIsInstance(results[2].error, FileNotFoundError)
+
+
+class TestUploadBatch(TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+
+    def test_upload_batch(self):
+        telegraph = Telegraph(session=self.server.session())
+        uploaded = {}
+
+        logo = (io.BytesIO(PNG), 'logo.png')
+        logo_copy = (io.BytesIO(PNG), 'logo-copy.png')
+        images = [
+            (io.BytesIO(GIF + bytes([i])), 'image.gif') for i in range(5)
+        ]
+
+        srcs = telegraph.upload_batch(
+            [logo, logo_copy] + images, uploaded, files_per_request=2
+        )
+
+        self.assertEqual(srcs[logo], srcs[logo_copy])
+        self.assertEqual(len(set(srcs.values())), 6)
+        self.assertEqual(self.server.files[srcs[images[3]]], GIF + b'\x03')
+        self.assertEqual(len(self.server.requests_for('upload')), 3)
+        self.assertEqual(len(uploaded), 6)
+
+        # already uploaded
+        logo[0].seek(0)
+        self.assertEqual(
+            telegraph.upload_batch([logo], uploaded), {logo: srcs[logo]}
+        )
+        self.assertEqual(len(self.server.requests_for('upload')), 3)
+
+    def test_upload_batch_error(self):
+        telegraph = Telegraph(session=self.server.session())
+        uploaded = {}
+
+        good = (io.BytesIO(PNG), 'image.png')
+        bad = (io.BytesIO(b'text'), 'file.txt')
+
+        with self.assertRaisesRegex(TelegraphException, 'File type invalid'):
+            telegraph.upload_batch([bad, good], uploaded, files_per_request=1)
+
+        # successful uploads are remembered
+        self.assertEqual(list(uploaded.values()), [
+            src for src, content in self.server.files.items()
+            if content == PNG
+        ])
+
+    def test_upload_batch_async(self):
+        images = [(io.BytesIO(GIF), 'a.gif'), (io.BytesIO(GIF), 'b.gif')]
+
+        async def upload():
+            telegraph = AsyncTelegraph(session=self.server.async_session())
+            return await telegraph.upload_batch(images)
+
+        srcs = asyncio.run(upload())
+
+        self.assertEqual(srcs[images[0]], srcs[images[1]])
+        self.assertEqual(len(self.server.requests_for('upload')), 1)
+
+
+class TestMimetypes(TestCase):
+    def test_sniff(self):
+        samples = [
+            (PNG, 'image/png'),
+            (GIF, 'image/gif'),
+            (b'GIF87a', 'image/gif'),
+            (b'\xff\xd8\xff\xe0\x00\x10JFIF', 'image/jpeg'),
+            (b'\x00\x00\x00\x18ftypmp42', 'video/mp4'),
+            (b'\x00\x00\x00\x20ftypisom', 'video/mp4'),
+            (b'\x00\x00\x00\x14ftypqt  ', None),
+            (b'\x00\x00\x00\x18ftypheic', None),
+            (b'\x00\x00\x00\x20ftypM4A ', None),
+            (b'<html>', None),
+        ]
+
+        for content, mimetype in samples:
+            f = io.BytesIO(b'xx' + content)
+            f.seek(2)
+
+            self.assertEqual(guess_mimetype(f), mimetype)
+            self.assertEqual(f.tell(), 2)
+
+        # not sniffed as mp4, guessed by the filename
+        mov = io.BytesIO(b'\x00\x00\x00\x14ftypqt  ')
+        self.assertEqual(guess_mimetype(mov, 'clip.mov'), 'video/quicktime')
+
+    def test_files_opener(self):
+        unnamed = io.BytesIO(PNG)
+        by_name = (io.BytesIO(b'unknown'), 'video.mp4')
+        override = (io.BytesIO(PNG), 'image.png', 'image/gif')
+
+        with FilesOpener([unnamed, by_name, override]) as files:
+            self.assertEqual(
+                [mimetype for _, (_, _, mimetype) in files],
+                ['image/png', 'video/mp4', 'image/gif']
+            )
+
+        self.assertIs(get_mimetypes_db(), get_mimetypes_db())
+
+
+class TestUploadMedia(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        self.filename = os.path.join(tmp.name, 'image.png')
+        with open(self.filename, 'wb') as f:
+            f.write(PNG)
+
+        self.server = FakeTelegraphServer()
+
+    def test_media_file(self):
+        self.assertEqual(media_file(self.filename), self.filename)
+        self.assertEqual(
+            media_file('file://' + pathname2url(self.filename)), self.filename
+        )
+        self.assertIsNone(media_file('/file/6c2ecfdfd6881d37913fa.png'))
+
+        root = os.path.dirname(self.filename)
+        self.assertIsNone(media_file('image.png'))
+        self.assertEqual(media_file('image.png', root), self.filename)
+        self.assertEqual(
+            media_file(self.filename, '/elsewhere'), self.filename
+        )
+        self.assertIsNone(media_file('https://example.com/image.png'))
+
+        f, name, mimetype = media_file(
+            'data:image/gif;base64,' + base64.b64encode(GIF).decode()
+        )
+        self.assertEqual((f.read(), mimetype), (GIF, 'image/gif'))
+
+        f, name, mimetype = media_file('data:,a%20b')
+        self.assertEqual((f.read(), mimetype), (b'a b', None))
+
+    def test_create_page(self):
+        telegraph = Telegraph(session=self.server.session())
+        telegraph.create_account('test')
+
+        data_uri = 'data:image/gif;base64,' + base64.b64encode(GIF).decode()
+        content = [
+            {'tag': 'p', 'children': [
+                {'tag': 'img', 'attrs': {'src': self.filename}},
+                {'tag': 'img', 'attrs': {'src': data_uri}},
+            ]},
+            {'tag': 'figure', 'children': [
+                {'tag': 'video', 'attrs': {'src': data_uri}},
+                {'tag': 'img', 'attrs': {'src': '/file/remote.png'}},
+            ]},
+        ]
+        uploaded = {}
+
+        page = telegraph.create_page(
+            'Title', content=content, return_content=True,
+            upload_media=uploaded
+        )
+
+        srcs = [
+            node['attrs']['src']
+            for block in page['content'] for node in block['children']
+        ]
+        self.assertEqual(
+            [self.server.files.get(src) for src in srcs],
+            [PNG, GIF, GIF, None]
+        )
+        self.assertEqual(srcs[3], '/file/remote.png')
+        self.assertEqual(len(uploaded), 2)
+
+        # content passed in isn't modified
+        self.assertEqual(content[0]['children'][0]['attrs']['src'],
+                         self.filename)
+
+    def test_media_root(self):
+        telegraph = Telegraph(session=self.server.session())
+        telegraph.create_account('test')
+
+        page = telegraph.create_page(
+            'Title', html_content='<img src="image.png"/>',
+            return_content=True, upload_media=True,
+            media_root=os.path.dirname(self.filename)
+        )
+
+        self.assertEqual(
+            self.server.files[page['content'][0]['attrs']['src']], PNG
+        )
+
+    def test_unchanged_edit_not_uploaded(self):
+        telegraph = Telegraph(
+            session=self.server.session(), state_store=MemoryStateStore()
+        )
+        telegraph.create_account('test')
+        html = '<img src="{}"/>'.format(self.filename)
+
+        path = telegraph.create_page(
+            'Title', html_content=html, upload_media=True
+        )['path']
+        telegraph.edit_page(
+            path, 'Title', html_content=html, upload_media=True
+        )
+
+        methods = [r[0] for r in self.server.requests]
+        self.assertEqual(methods, ['createAccount', 'upload', 'createPage'])
+
+        # same src, new file content
+        with open(self.filename, 'wb') as f:
+            f.write(GIF)
+
+        telegraph.edit_page(
+            path, 'Title', html_content=html, upload_media=True
+        )
+
+        methods = [r[0] for r in self.server.requests]
+        self.assertEqual(methods[3:], ['upload', 'editPage'])
+
+    def test_media_hashed_once(self):
+        telegraph = Telegraph(
+            session=self.server.session(), state_store=MemoryStateStore()
+        )
+        telegraph.create_account('test')
+
+        with mock.patch.object(
+            api, 'file_hash', wraps=api.file_hash
+        ) as file_hash:
+            page = telegraph.create_page(
+                'Title', html_content='<img src="{}"/>'.format(self.filename),
+                return_content=True, upload_media=True
+            )
+
+        self.assertEqual(file_hash.call_count, 1)
+        self.assertEqual(
+            self.server.files[page['content'][0]['attrs']['src']], PNG
+        )
+
+    def test_upload_media_disabled(self):
+        telegraph = Telegraph(session=self.server.session())
+        telegraph.create_account('test')
+
+        for upload_media in (None, False, 0):
+            page = telegraph.create_page(
+                'Title', html_content='<img src="{}"/>'.format(self.filename),
+                return_content=True, upload_media=upload_media
+            )
+            self.assertEqual(
+                page['content'][0]['attrs']['src'], self.filename
+            )
+
+        self.assertEqual(
+            self.server.requests_for('upload'), []
+        )
+
+    def test_create_page_async(self):
+        async def create_page():
+            telegraph = AsyncTelegraph(session=self.server.async_session())
+            await telegraph.create_account('test')
+
+            return await telegraph.create_page(
+                'Title', html_content='<img src="{}"/>'.format(self.filename),
+                return_content=True, upload_media=True
+            )
+
+        page = asyncio.run(create_page())
+        src = page['content'][0]['attrs']['src']
+
+        self.assertEqual(self.server.files[src], PNG)